@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from scipy.stats import norm
 from database import ExecutionDatabase
 
 class PerformanceAnalytics:
@@ -8,12 +9,18 @@ class PerformanceAnalytics:
     Advanced analytics and reporting for execution performance
     """
     
-    def __init__(self):
-        self.db = ExecutionDatabase()
+    def __init__(self, archive=None):
+        """
+        Reports come from the SQLite rollups, or from a FillArchive when one
+        is given (for histories too large for row-oriented queries)
+        """
+        self.archive = archive
+        self.db = ExecutionDatabase() if archive is None else None
+        self.source = archive if archive is not None else self.db
     
     def generate_performance_report(self, days=30):
         """Generate comprehensive performance report"""
-        analytics_df = self.db.get_performance_analytics(days)
+        analytics_df = self.source.get_performance_analytics(days)
         
         print("📊 EXECUTION PERFORMANCE REPORT")
         print("=" * 50)
@@ -38,21 +45,9 @@ class PerformanceAnalytics:
     
     def plot_performance_trends(self, days=30):
         """Plot performance trends over time"""
-        conn = self.db.db_path
-        query = '''
-            SELECT 
-                date(timestamp) as trade_date,
-                strategy,
-                AVG(cost_per_share) as daily_avg_cost
-            FROM executions
-            WHERE timestamp >= datetime('now', '-? days')
-            GROUP BY date(timestamp), strategy
-            ORDER BY trade_date
-        '''
-        
         try:
-            df = pd.read_sql_query(query, conn, params=(days,))
-        except:
+            df = self.source.get_daily_performance(days)
+        except Exception:
             print("No data available for plotting. Run some executions first.")
             return
         
@@ -77,6 +72,242 @@ class PerformanceAnalytics:
         plt.savefig('performance_trends.png', dpi=300, bbox_inches='tight')
         plt.show()
 
+    def transaction_cost_report(self, fills, market_bars=None, by=('strategy',), **engine_options):
+        """
+        Slippage vs arrival, interval VWAP and close for a DataFrame (or an
+        iterable of DataFrame chunks) of fills; see TCAEngine
+        """
+        report = TCAEngine(market_bars, **engine_options).analyze(fills, by)
+
+        print("📐 TRANSACTION COST ANALYSIS (bps, + = cost)")
+        print("=" * 50)
+        if report.empty:
+            print("No fills to analyze.")
+            return report
+
+        for row in report.itertuples(index=False):
+            label = ' / '.join(str(getattr(row, key)) for key in by)
+            if not row.fills:
+                print(f"{label} vs {row.benchmark}: no benchmark prices")
+                continue
+            print(f"{label} vs {row.benchmark}: {row.mean_bps:+.2f} "
+                  f"[{row.ci_low_bps:+.2f}, {row.ci_high_bps:+.2f}], fills {row.fills:,}")
+        return report
+
+class TCAEngine:
+    """
+    Vectorized transaction cost analysis over fill-level data
+
+    Each fill's slippage in bps (positive = cost) is measured against the
+    arrival price, the market VWAP over the order's interval and the close,
+    and grouped by strategy, symbol, urgency bucket and day. Fills can be fed
+    in chunks: groups keep mergeable quantity-weighted moments (mean, std,
+    confidence interval) and sparse histograms at resolution_bps (weighted
+    percentiles), so memory grows with the number of groups, not fills.
+
+    Fill columns: timestamp, symbol, strategy, urgency, quantity, price,
+    arrival_price, close_price and optionally side ('buy'/'sell' or +1/-1).
+    The VWAP benchmark comes from an interval_vwap column, or from
+    market_bars (symbol, timestamp, price, volume) over each fill's
+    [order_start, order_end]; without either it is left empty.
+    """
+
+    BENCHMARKS = ('arrival', 'vwap', 'close')
+    GROUP_KEYS = ('strategy', 'symbol', 'urgency_bucket', 'day')
+
+    def __init__(self, market_bars=None, percentiles=(5, 25, 50, 75, 95), confidence=0.95,
+                 urgency_edges=(1 / 3, 2 / 3), urgency_labels=('low', 'medium', 'high'),
+                 resolution_bps=0.5, clip_bps=5000.0, chunk_rows=1_000_000):
+        self.percentiles = tuple(percentiles)
+        self.z = norm.ppf(0.5 + confidence / 2)
+        self.urgency_edges = np.asarray(urgency_edges, dtype=float)
+        self.urgency_labels = np.asarray(urgency_labels, dtype=object)
+        self.resolution_bps = resolution_bps
+        self.clip_bps = clip_bps
+        self.n_bins = int(np.ceil(2 * clip_bps / resolution_bps)) + 1
+        self.chunk_rows = chunk_rows
+        self._bars = self._index_bars(market_bars) if market_bars is not None else {}
+        self.reset()
+
+    def reset(self):
+        self._group_ids = {}
+        self._moments = np.zeros((0, len(self.BENCHMARKS), 5))
+        self._hist = [(np.zeros(0, dtype=np.int64), np.zeros(0)) for _ in self.BENCHMARKS]
+
+    @staticmethod
+    def _index_bars(market_bars):
+        """Per-symbol bar times with cumulative notional and volume"""
+        index = {}
+        bars = market_bars.sort_values(['symbol', 'timestamp'])
+        for symbol, group in bars.groupby('symbol', sort=False):
+            volume = group['volume'].to_numpy(dtype=float)
+            notional = group['price'].to_numpy(dtype=float) * volume
+            index[symbol] = (pd.to_datetime(group['timestamp']).to_numpy(dtype='datetime64[ns]'),
+                             np.concatenate([[0.0], np.cumsum(notional)]),
+                             np.concatenate([[0.0], np.cumsum(volume)]))
+        return index
+
+    def interval_vwap(self, symbols, start, end):
+        """Market VWAP between start and end (inclusive) for each row"""
+        start = pd.to_datetime(start).to_numpy(dtype='datetime64[ns]')
+        end = pd.to_datetime(end).to_numpy(dtype='datetime64[ns]')
+        vwap = np.full(len(start), np.nan)
+        for symbol, rows in pd.Series(np.asarray(symbols)).groupby(np.asarray(symbols)).indices.items():
+            if symbol not in self._bars:
+                continue
+            times, cum_notional, cum_volume = self._bars[symbol]
+            lo = np.searchsorted(times, start[rows], side='left')
+            hi = np.searchsorted(times, end[rows], side='right')
+            volume = cum_volume[hi] - cum_volume[lo]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                vwap[rows] = np.where(volume > 0, (cum_notional[hi] - cum_notional[lo]) / volume,
+                                      np.nan)
+        return vwap
+
+    def slippage(self, fills):
+        """Group keys, quantity and slippage_<benchmark>_bps for every fill"""
+        fills = pd.DataFrame(fills)
+        price = fills['price'].to_numpy(dtype=float)
+        quantity = np.abs(fills['quantity'].to_numpy(dtype=float))
+
+        if 'side' not in fills:
+            sign = np.ones(len(fills))
+        elif pd.api.types.is_numeric_dtype(fills['side']):
+            sign = np.where(fills['side'].to_numpy(dtype=float) < 0, -1.0, 1.0)
+        else:
+            sign = np.where(fills['side'].astype(str).str.lower().str.startswith('s'), -1.0, 1.0)
+
+        nan = np.full(len(fills), np.nan)
+        if 'interval_vwap' in fills:
+            vwap = fills['interval_vwap'].to_numpy(dtype=float)
+        elif self._bars and {'order_start', 'order_end'}.issubset(fills.columns):
+            vwap = self.interval_vwap(fills['symbol'], fills['order_start'], fills['order_end'])
+        else:
+            vwap = nan
+        benchmarks = {
+            'arrival': fills['arrival_price'].to_numpy(dtype=float) if 'arrival_price' in fills else nan,
+            'vwap': vwap,
+            'close': fills['close_price'].to_numpy(dtype=float) if 'close_price' in fills else nan,
+        }
+
+        urgency = np.clip(fills['urgency'].to_numpy(dtype=float), 0, 1)
+        result = pd.DataFrame({
+            'strategy': fills['strategy'].fillna('unknown').to_numpy(),
+            'symbol': fills['symbol'].fillna('unknown').to_numpy(),
+            'urgency_bucket': self.urgency_labels[np.searchsorted(self.urgency_edges, urgency)],
+            'day': pd.to_datetime(fills['timestamp']).dt.normalize().to_numpy(),
+            'quantity': quantity,
+        })
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name in self.BENCHMARKS:
+                result[f'slippage_{name}_bps'] = sign * (price - benchmarks[name]) / benchmarks[name] * 1e4
+        return result
+
+    def add(self, fills):
+        """Accumulate one chunk of fills"""
+        frame = self.slippage(fills)
+        if frame.empty:
+            return
+        codes, uniques = pd.MultiIndex.from_frame(frame[list(self.GROUP_KEYS)]).factorize()
+        group = np.array([self._group_ids.setdefault(key, len(self._group_ids))
+                          for key in uniques], dtype=np.int64)[codes]
+        n_groups = len(self._group_ids)
+        if n_groups > len(self._moments):
+            grown = np.zeros((max(n_groups, 2 * len(self._moments)), *self._moments.shape[1:]))
+            grown[:len(self._moments)] = self._moments
+            self._moments = grown
+
+        quantity = frame['quantity'].to_numpy()
+        offset = self.n_bins // 2
+        for b, name in enumerate(self.BENCHMARKS):
+            slip = frame[f'slippage_{name}_bps'].to_numpy()
+            valid = np.isfinite(slip) & (quantity > 0)
+            g, w, x = group[valid], quantity[valid], slip[valid]
+            for m, weights in enumerate((None, w, w * w, w * x, w * x * x)):
+                self._moments[:n_groups, b, m] += np.bincount(g, weights=weights, minlength=n_groups)
+
+            bins = np.floor(np.clip(x, -self.clip_bps, self.clip_bps) / self.resolution_bps)
+            hist_codes = g * self.n_bins + bins.astype(np.int64) + offset
+            self._hist[b] = self._merge_hist(np.concatenate([self._hist[b][0], hist_codes]),
+                                             np.concatenate([self._hist[b][1], w]))
+
+    @staticmethod
+    def _merge_hist(codes, weights):
+        codes, inverse = np.unique(codes, return_inverse=True)
+        return codes, np.bincount(inverse.ravel(), weights=weights, minlength=len(codes))
+
+    def analyze(self, fills, by=GROUP_KEYS):
+        """
+        Run TCA over a DataFrame (processed chunk_rows at a time) or an
+        iterable of DataFrames, and return result(by)
+        """
+        self.reset()
+        chunks = fills
+        if isinstance(fills, pd.DataFrame):
+            chunks = (fills.iloc[i:i + self.chunk_rows] for i in range(0, len(fills), self.chunk_rows))
+        for chunk in chunks:
+            self.add(chunk)
+        return self.result(by)
+
+    def result(self, by=GROUP_KEYS):
+        """
+        Per-group, per-benchmark statistics in bps, rolled up to the keys in
+        `by` (any subset of GROUP_KEYS, in that order); a benchmark with no
+        usable prices for a group gets fills=0 and NaN statistics
+        """
+        positions = [self.GROUP_KEYS.index(key) for key in by]
+        coarse_ids = {}
+        mapping = np.array([coarse_ids.setdefault(tuple(key[i] for i in positions), len(coarse_ids))
+                            for key in self._group_ids], dtype=np.int64)
+        n_groups = len(coarse_ids)
+        keys = pd.DataFrame(list(coarse_ids), columns=list(by))
+
+        frames = []
+        for b, name in enumerate(self.BENCHMARKS):
+            moments = np.stack([np.bincount(mapping, weights=self._moments[:len(mapping), b, m],
+                                            minlength=n_groups) for m in range(5)], axis=1)
+            count, w, w2, wx, wx2 = moments.T
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = wx / w
+                std = np.sqrt(np.maximum(wx2 / w - mean ** 2, 0))
+                half_width = self.z * std / np.sqrt(w ** 2 / w2)
+
+            frame = keys.assign(benchmark=name, fills=count.astype(np.int64), quantity=w,
+                                mean_bps=mean, std_bps=std, ci_low_bps=mean - half_width,
+                                ci_high_bps=mean + half_width)
+            for p, values in zip(self.percentiles, self._hist_percentiles(b, mapping, n_groups)):
+                frame[f'p{p:g}_bps'] = values
+            frames.append(frame)
+
+        return pd.concat(frames, ignore_index=True).sort_values([*by, 'benchmark'],
+                                                                ignore_index=True)
+
+    def _hist_percentiles(self, b, mapping, n_groups):
+        """Weighted percentiles per coarse group from the sparse histograms"""
+        codes, weights = self._hist[b]
+        if not len(codes):
+            # No finite slippage for this benchmark (e.g. no VWAP or close given)
+            return [np.full(n_groups, np.nan) for _ in self.percentiles]
+        group = mapping[codes // self.n_bins]
+        bins = codes % self.n_bins
+        order = np.lexsort((bins, group))
+        group, bins, weights = group[order], bins[order], weights[order]
+
+        cumulative = np.cumsum(weights)
+        totals = np.bincount(group, weights=weights, minlength=n_groups)
+        first = np.searchsorted(group, np.arange(n_groups), side='left')
+        last = np.searchsorted(group, np.arange(n_groups), side='right') - 1
+        before = cumulative[np.maximum(first, 1) - 1] * (first > 0)
+
+        results = []
+        for p in self.percentiles:
+            position = np.searchsorted(cumulative, before + totals * p / 100, side='left')
+            position = np.clip(position, first, np.maximum(last, first))
+            values = (bins[np.minimum(position, len(bins) - 1)] - self.n_bins // 2 + 0.5)
+            values = values * self.resolution_bps
+            results.append(np.where(totals > 0, values, np.nan))
+        return results
+
 def main():
     """Standalone analytics main function"""
     print("📊 EXECUTION ANALYTICS DASHBOARD")
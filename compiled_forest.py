@@ -0,0 +1,77 @@
+import numpy as np
+
+class CompiledForest:
+    """
+    A trained sklearn tree ensemble flattened into contiguous NumPy arrays
+
+    All trees share one node table (feature, threshold, left, right, value)
+    with per-tree root offsets. Leaves point to themselves, so evaluation is
+    at most max_depth vectorized steps over every (row, tree) pair at once;
+    latency grows with depth, so it pays off only for depth-bounded forests.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # children[2 * node + go_right] is the next node
+        self.children = np.ascontiguousarray(np.column_stack([left, right]).ravel())
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        # Model this forest was compiled from, so callers can detect swaps
+        self.source_model = None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Compile a fitted RandomForestRegressor (or any regressor with estimators_)"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            own_index = np.arange(n_nodes) + offset
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, own_index, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own_index, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(np.concatenate(features).astype(np.intp),
+                   np.concatenate(thresholds),
+                   np.concatenate(lefts).astype(np.intp),
+                   np.concatenate(rights).astype(np.intp),
+                   np.concatenate(values),
+                   np.array(roots, dtype=np.intp),
+                   max_depth,
+                   model.n_features_in_)
+
+    def predict(self, X):
+        """Mean leaf value across trees for each row of X"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features)
+        row_offsets = (np.arange(len(X)) * self.n_features)[:, None]
+        X_flat = X.ravel()
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+
+        for _ in range(self.max_depth):
+            go_right = X_flat[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            next_nodes = self.children[2 * nodes + go_right]
+            if np.array_equal(next_nodes, nodes):
+                break
+            nodes = next_nodes
+
+        return self.value[nodes].mean(axis=1)
+
+    def max_abs_error(self, model, X):
+        """Largest absolute difference from the sklearn model's predictions on X"""
+        return np.max(np.abs(self.predict(X) - model.predict(np.asarray(X, dtype=float))))
@@ -0,0 +1,97 @@
+import numpy as np
+
+class CovarianceEstimator:
+    """
+    Incrementally maintained return covariance for a universe of symbols
+
+    method='shrinkage' keeps running second and fourth moments and shrinks
+    the sample covariance towards a scaled identity with the Ledoit-Wolf
+    intensity; method='ewma' keeps an exponentially weighted covariance.
+    Returns are treated as zero-mean. Each new bar is an O(n^2) update, and
+    the covariance matrix is cached until the next one.
+    Matrices are scaled by periods_per_day so they are daily covariances.
+    """
+
+    def __init__(self, symbols, method='shrinkage', halflife=60, periods_per_day=1):
+        if method not in ('shrinkage', 'ewma'):
+            raise ValueError(f"Unknown covariance method: {method}")
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.method = method
+        self.decay = 0.5 ** (1 / halflife)
+        self.periods_per_day = periods_per_day
+
+        n = len(self.symbols)
+        self.count = 0
+        self.second_moment = np.zeros((n, n))
+        self.fourth_moment = 0.0
+        self._cache = {}
+
+    @classmethod
+    def from_history(cls, returns, **kwargs):
+        """Build from a DataFrame of returns (rows are bars, columns symbols)"""
+        estimator = cls(returns.columns, **kwargs)
+        estimator.update_many(returns.to_numpy())
+        return estimator
+
+    def update(self, returns):
+        """Add one bar of returns aligned to self.symbols (NaN counts as 0)"""
+        x = np.nan_to_num(np.asarray(returns, dtype=float))
+        if self.method == 'ewma':
+            weight = 1 - self.decay if self.count else 1.0
+            self.second_moment *= 1 - weight
+            self.second_moment += weight * np.outer(x, x)
+        else:
+            self.second_moment += np.outer(x, x)
+            self.fourth_moment += np.dot(x, x) ** 2
+        self.count += 1
+        self._cache.clear()
+
+    def update_many(self, returns_2d):
+        """Add a block of bars (rows) at once"""
+        X = np.nan_to_num(np.atleast_2d(np.asarray(returns_2d, dtype=float)))
+        if self.method == 'ewma':
+            for x in X:
+                self.update(x)
+            return
+        self.second_moment += X.T @ X
+        self.fourth_moment += np.sum(np.einsum('ij,ij->i', X, X) ** 2)
+        self.count += len(X)
+        self._cache.clear()
+
+    def shrinkage_intensity(self):
+        """Ledoit-Wolf intensity towards mu * I (0 for EWMA)"""
+        if self.method == 'ewma' or self.count < 2:
+            return 0.0
+        sample = self.second_moment / self.count
+        mu = np.trace(sample) / len(sample)
+        pi = (self.fourth_moment / self.count - np.sum(sample**2)) / self.count
+        distance = np.sum((sample - mu * np.eye(len(sample)))**2)
+        return float(np.clip(pi / distance, 0, 1)) if distance > 0 else 1.0
+
+    def covariance(self, symbols=None):
+        """Daily covariance for the universe, or a cheap sub-block for symbols"""
+        if 'covariance' not in self._cache:
+            if self.count == 0:
+                raise ValueError("Covariance estimator has no data")
+            if self.method == 'ewma':
+                matrix = self.second_moment.copy()
+            else:
+                sample = self.second_moment / self.count
+                delta = self.shrinkage_intensity()
+                target = np.trace(sample) / len(sample) * np.eye(len(sample))
+                matrix = delta * target + (1 - delta) * sample
+            matrix *= self.periods_per_day
+            matrix.setflags(write=False)
+            self._cache['covariance'] = matrix
+
+        matrix = self._cache['covariance']
+        if symbols is None:
+            return matrix
+        idx = [self.index[symbol] for symbol in symbols]
+        return matrix[np.ix_(idx, idx)]
+
+    def correlation(self, symbols=None):
+        matrix = self.covariance(symbols)
+        scale = np.sqrt(np.diag(matrix))
+        return matrix / np.outer(scale, scale)
@@ -1,7 +1,13 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
 import socket
 import os
+import sys
+import gzip
+import hashlib
+import numpy as np
+from main import AdvancedOptimalExecution
+from market_snapshot import MarketSnapshotCache
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -18,9 +24,22 @@ def get_local_ip():
     except:
         return "127.0.0.1"
 
-@app.route('/')
-def home():
-    local_ip = get_local_ip()
+def load_engine():
+    """
+    Build the execution engine and warm its model, so that under a
+    preloading server this happens once and workers inherit it on fork
+    """
+    engine = AdvancedOptimalExecution()
+    engine.ml_predictor.compile_forest()
+    # Training (when no model is stored) seeds the global RNG with a constant
+    np.random.seed(None)
+    return engine
+
+def reseed_worker(server, worker):
+    """gunicorn post_fork hook: forked workers would all share one RNG state"""
+    np.random.seed(None)
+
+def render_home(local_ip):
     return f'''
     <!DOCTYPE html>
     <html>
@@ -174,7 +193,7 @@ def home():
                 <div class="network-info">
                     <div><strong>Local Access:</strong> http://localhost:5001</div>
                     <div><strong>Network Access:</strong> http://{local_ip}:5001</div>
-                    <div><strong>Your Current IP:</strong> {request.remote_addr if 'request' in locals() else 'Unknown'}</div>
+                    <div><strong>Your Current IP:</strong> <span class="client-ip">Unknown</span></div>
                 </div>
             </header>
             
@@ -224,7 +243,7 @@ def home():
                     </div>
                     <div class="metric">
                         <span>Your IP:</span>
-                        <span class="metric-value">{request.remote_addr if 'request' in locals() else 'Unknown'}</span>
+                        <span class="metric-value client-ip">Unknown</span>
                     </div>
                 </div>
             </div>
@@ -332,6 +351,9 @@ def home():
                     const response = await fetch('/api/health');
                     const data = await response.json();
                     console.log('✅ Server health:', data);
+                    document.querySelectorAll('.client-ip').forEach(el => {{
+                        el.textContent = data.client_ip;
+                    }});
                 }} catch (error) {{
                     console.log('❌ Server connection failed:', error);
                 }}
@@ -341,31 +363,71 @@ def home():
     </html>
     '''
 
+LOCAL_IP = get_local_ip()
+HOME_PAGE = render_home(LOCAL_IP).encode()
+HOME_PAGE_GZIP = gzip.compress(HOME_PAGE, compresslevel=9)
+HOME_PAGE_ETAG = hashlib.sha1(HOME_PAGE).hexdigest()
+HOME_PAGE_GZIP_ETAG = HOME_PAGE_ETAG + '-gz'
+
+execution_engine = load_engine()
+market_snapshots = MarketSnapshotCache(execution_engine.data_feed, interval=1.0)
+
+@app.route('/')
+def home():
+    """Page prebuilt at startup, gzipped when the client accepts it"""
+    # Each encoding is a different representation, so each has its own ETag
+    gzipped = 'gzip' in request.accept_encodings
+    etag = HOME_PAGE_GZIP_ETAG if gzipped else HOME_PAGE_ETAG
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif gzipped:
+        response = Response(HOME_PAGE_GZIP, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(HOME_PAGE, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 @app.route('/api/execute', methods=['POST'])
 def api_execute():
     data = request.json
+    order_size = data.get('order_size', 0)
+    urgency = data.get('urgency', 0.5)
+    strategy = data.get('strategy', 'adaptive')
+    
+    try:
+        market_conditions = market_snapshots.get().data['market_conditions']
+        schedule, total_cost = execution_engine.plan_execution(
+            order_size, urgency, strategy, market_conditions)
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+    
     return jsonify({
         'status': 'success',
-        'message': f'Order for {data.get("order_size", 0):,} shares executed successfully!',
-        'order_size': data.get('order_size', 0),
-        'estimated_cost': data.get('order_size', 0) * 0.008
+        'message': f'Order for {order_size:,} shares executed successfully!',
+        'order_size': order_size,
+        'strategy': strategy,
+        'estimated_cost': float(total_cost),
+        'cost_per_share': float(total_cost / order_size) if order_size else 0.0,
+        'completion_time': len(schedule) * execution_engine.config.MIN_TIME_SLICE
     })
 
 @app.route('/api/analysis')
 def api_analysis():
-    return jsonify({
-        'market_conditions': {
-            'volatility': 0.023,
-            'average_volume': 1500000,
-            'momentum': 0.008,
-            'spread': 0.012
-        },
-        'hidden_liquidity': {
-            'hidden_buy_pressure': 0.25,
-            'hidden_sell_pressure': 0.35,
-            'iceberg_indication': 0.15
-        }
-    })
+    try:
+        snapshot = market_snapshots.get()
+    except Exception as e:
+        return jsonify({'error': str(e), 'market_conditions': {}, 'hidden_liquidity': {}}), 500
+    
+    if request.if_none_match.contains(snapshot.etag):
+        response = Response(status=304)
+    else:
+        response = Response(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/health')
 def api_health():
@@ -376,15 +438,41 @@ def api_health():
         'client_ip': request.remote_addr
     })
 
+def run_production(host='0.0.0.0', port=5001, workers=None):
+    """
+    Serve with gunicorn (equivalent to `gunicorn --preload dashboard_network:app`):
+    the engine is already loaded when the master forks its workers, so they
+    share the model and profiles copy-on-write instead of each building one.
+    Each worker reseeds the global RNG after the fork.
+    """
+    from gunicorn.app.base import BaseApplication
+    
+    class DashboardServer(BaseApplication):
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return app
+    
+    DashboardServer({
+        'bind': f'{host}:{port}',
+        'workers': workers or 2 * (os.cpu_count() or 1) + 1,
+        'preload_app': True,
+        'post_fork': reseed_worker,
+        'timeout': 60
+    }).run()
+
 if __name__ == '__main__':
-    local_ip = get_local_ip()
+    production = '--production' in sys.argv or os.environ.get('DASHBOARD_MODE') == 'production'
     
     print("🚀 NETWORK-ENABLED OPTIMAL EXECUTION DASHBOARD")
     print("=" * 50)
     print(f"📱 Local Access:    http://localhost:5001")
-    print(f"🌐 Network Access:  http://{local_ip}:5001")
-    print(f"📡 Your IP:         {local_ip}")
+    print(f"🌐 Network Access:  http://{LOCAL_IP}:5001")
+    print(f"📡 Your IP:         {LOCAL_IP}")
     print(f"👤 Client IP:       Will show when connected")
+    print(f"⚙️  Mode:            {'production (gunicorn)' if production else 'development'}")
     print("=" * 50)
     print("🔧 Features:")
     print("   ✅ CORS Enabled")
@@ -394,6 +482,9 @@ if __name__ == '__main__':
     print("=" * 50)
     
     try:
-        app.run(debug=True, host='0.0.0.0', port=5001, use_reloader=False)
+        if production:
+            run_production()
+        else:
+            app.run(debug=True, host='0.0.0.0', port=5001, use_reloader=False)
     except Exception as e:
         print(f"❌ Failed to start: {e}")
\ No newline at end of file
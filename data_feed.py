@@ -1,14 +1,26 @@
+import time
+import threading
 import numpy as np
 import pandas as pd
 from typing import Dict, List
 
+CONDITION_FIELDS = ('volatility', 'average_volume', 'momentum', 'spread')
+
 class MarketDataFeed:
     """
     Simulated market data feed for testing execution strategies
     """
     
-    def __init__(self):
+    def __init__(self, volume_store=None, snapshot_interval=1.0):
         self.volume_patterns = self._generate_volume_patterns()
+        self.volume_store = volume_store
+        self.snapshot_interval = snapshot_interval
+        self.symbol_index = {}
+        self.snapshot_symbols = []
+        self.snapshot = {field: np.empty(0) for field in CONDITION_FIELDS}
+        self.snapshot_time = np.empty(0)
+        self._snapshot_lock = threading.Lock()
+        self.liquidity_detectors = {}
         
     def _generate_volume_patterns(self):
         """Generate typical U-shaped volume patterns"""
@@ -17,13 +29,21 @@ class MarketDataFeed:
         volume = 1000 + 500 * (np.exp(-times/100) + np.exp(-(390-times)/100))
         return volume
     
-    def get_historical_volume(self, days=30):
+    def get_historical_volume(self, days=30, rng=None, symbol=None):
         """Get historical volume data"""
-        patterns = []
-        for _ in range(days):
-            noise = np.random.normal(1, 0.1, 390)
-            patterns.append(self.volume_patterns * noise)
-        return np.array(patterns)
+        if symbol is not None and self.volume_store is not None:
+            if self.volume_store.n_days(symbol):
+                return self.volume_store.history(symbol, days)
+        rng = rng or np.random
+        noise = rng.normal(1, 0.1, (days, 390))
+        return self.volume_patterns * noise
+    
+    def get_volume_profile(self, symbol=None, days=30, rng=None):
+        """Average intraday volume curve, from the profile store when available"""
+        if symbol is not None and self.volume_store is not None:
+            if self.volume_store.n_days(symbol):
+                return self.volume_store.average_profile(symbol, days)
+        return self.get_historical_volume(1, rng)[0]
     
     def estimate_hidden_liquidity(self, recent_trades=None, order_book=None):
         """
@@ -50,17 +70,194 @@ class MarketDataFeed:
             hidden_probabilities['hidden_sell_pressure'] = min(0.8, ask_volume / (bid_volume + ask_volume))
         
         # Analyze trade size distribution
-        large_trades = [t for t in recent_trades if t > np.percentile(recent_trades, 90)]
-        if large_trades:
-            hidden_probabilities['iceberg_indication'] = len(large_trades) / len(recent_trades)
+        recent_trades = np.asarray(recent_trades)
+        n_large = int(np.count_nonzero(recent_trades > np.percentile(recent_trades, 90)))
+        if n_large:
+            hidden_probabilities['iceberg_indication'] = n_large / len(recent_trades)
         
         return hidden_probabilities
     
-    def get_market_conditions(self):
+    def get_universe_conditions(self, symbols, rng=None):
+        """
+        Market conditions for many symbols as columnar arrays aligned to symbols
+        
+        Served from a per-symbol snapshot; only rows older than
+        snapshot_interval seconds are recomputed, in one vectorized draw.
+        Safe to call from several threads.
+        """
+        with self._snapshot_lock:
+            index = np.array([self._snapshot_row(symbol) for symbol in symbols], dtype=int)
+            now = time.monotonic()
+            stale = np.unique(index[now - self.snapshot_time[index] >= self.snapshot_interval])
+            
+            if len(stale):
+                fresh = self._compute_conditions([self.snapshot_symbols[row] for row in stale], rng)
+                for field in CONDITION_FIELDS:
+                    self.snapshot[field][stale] = fresh[field]
+                self.snapshot_time[stale] = now
+            
+            return {field: self.snapshot[field][index] for field in CONDITION_FIELDS}
+    
+    def _snapshot_row(self, symbol):
+        # Caller holds _snapshot_lock
+        row = self.symbol_index.get(symbol)
+        if row is None:
+            row = self.symbol_index[symbol] = len(self.snapshot_symbols)
+            self.snapshot_symbols.append(symbol)
+            if row >= len(self.snapshot_time):
+                capacity = max(64, 2 * len(self.snapshot_time))
+                for field in CONDITION_FIELDS:
+                    self.snapshot[field] = np.resize(self.snapshot[field], capacity)
+                self.snapshot_time = np.resize(self.snapshot_time, capacity)
+                self.snapshot_time[row:] = -np.inf
+        return row
+    
+    def _compute_conditions(self, symbols, rng=None):
+        """Fresh conditions for a list of symbols, one column per field"""
+        rng = rng or np.random
+        n = len(symbols)
+        return {
+            'volatility': rng.uniform(0.01, 0.05, n),
+            'average_volume': np.full(n, 1000000.0),
+            'momentum': rng.uniform(-0.02, 0.02, n),
+            'spread': rng.uniform(0.01, 0.05, n)
+        }
+    
+    def liquidity_detector(self, symbol, window=1000, quantile=0.9):
+        """Streaming hidden-liquidity detector for a symbol, created on first use"""
+        if symbol not in self.liquidity_detectors:
+            self.liquidity_detectors[symbol] = HiddenLiquidityDetector(window, quantile)
+        return self.liquidity_detectors[symbol]
+    
+    def get_market_conditions(self, rng=None):
         """Get current market conditions"""
+        rng = rng or np.random
         return {
-            'volatility': np.random.uniform(0.01, 0.05),
+            'volatility': rng.uniform(0.01, 0.05),
             'average_volume': 1000000,
-            'momentum': np.random.uniform(-0.02, 0.02),
-            'spread': np.random.uniform(0.01, 0.05)
-        }
\ No newline at end of file
+            'momentum': rng.uniform(-0.02, 0.02),
+            'spread': rng.uniform(0.01, 0.05)
+        }
+
+
+class P2Quantile:
+    """
+    P-square streaming quantile estimator (Jain & Chlamtac): O(1) memory and
+    O(1) work per observation
+    """
+    
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+    
+    def add(self, x):
+        self.count += 1
+        q = self.heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+        
+        n = self.positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] += d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+    
+    def value(self):
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            return self.heights[min(self.count - 1, int(round(self.p * (self.count - 1))))]
+        return self.heights[2]
+
+
+class HiddenLiquidityDetector:
+    """
+    Streaming hidden-liquidity detector for one symbol
+    
+    Produces the same signals as MarketDataFeed.estimate_hidden_liquidity in
+    O(1) per update. The large-trade threshold comes from two staggered P²
+    sketches, each restarted every `window` trades, so it tracks roughly the
+    last window of the tape; the iceberg indication is the share of large
+    trades in a ring buffer over the last `window` trades.
+    """
+    
+    def __init__(self, window=1000, quantile=0.9):
+        self.window = window
+        self.quantile = quantile
+        self.trade_count = 0
+        self.large_flags = bytearray(window)
+        self.large_count = 0
+        self.sketches = [P2Quantile(quantile)]
+        self.bid_volume = 0
+        self.ask_volume = 0
+    
+    def ingest_trade(self, size):
+        """Update with one trade print and return the current signals"""
+        threshold = self.sketches[0].value()
+        is_large = int(threshold is not None and size > threshold)
+        
+        slot = self.trade_count % self.window
+        self.large_count += is_large - self.large_flags[slot]
+        self.large_flags[slot] = is_large
+        self.trade_count += 1
+        
+        for sketch in self.sketches:
+            sketch.add(size)
+        if self.trade_count % max(1, self.window // 2) == 0:
+            self.sketches.append(P2Quantile(self.quantile))
+            if len(self.sketches) > 2:
+                self.sketches.pop(0)
+        
+        return self.signals()
+    
+    def ingest_book(self, bid_volume, ask_volume):
+        """Update with the latest top-of-book sizes and return the current signals"""
+        self.bid_volume = bid_volume
+        self.ask_volume = ask_volume
+        return self.signals()
+    
+    def signals(self):
+        hidden_probabilities = {}
+        bid_volume = self.bid_volume
+        ask_volume = self.ask_volume
+        
+        if bid_volume > 2 * ask_volume:
+            hidden_probabilities['hidden_buy_pressure'] = min(0.8, bid_volume / (bid_volume + ask_volume))
+        elif ask_volume > 2 * bid_volume:
+            hidden_probabilities['hidden_sell_pressure'] = min(0.8, ask_volume / (bid_volume + ask_volume))
+        
+        if self.large_count:
+            hidden_probabilities['iceberg_indication'] = (
+                self.large_count / min(self.trade_count, self.window))
+        
+        return hidden_probabilities
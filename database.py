@@ -0,0 +1,191 @@
+import atexit
+import sqlite3
+import threading
+import queue
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from collections import defaultdict
+import pandas as pd
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS executions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        symbol TEXT,
+        strategy TEXT NOT NULL,
+        order_size REAL,
+        urgency REAL,
+        total_cost REAL,
+        cost_per_share REAL,
+        completion_time REAL,
+        volatility REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_executions_timestamp_strategy
+        ON executions (timestamp, strategy);
+    CREATE TABLE IF NOT EXISTS daily_rollup (
+        trade_date TEXT NOT NULL,
+        strategy TEXT NOT NULL,
+        trade_count INTEGER NOT NULL,
+        total_shares REAL NOT NULL,
+        sum_cost REAL NOT NULL,
+        sum_cost_per_share REAL NOT NULL,
+        sum_completion_time REAL NOT NULL,
+        PRIMARY KEY (trade_date, strategy)
+    );
+'''
+
+COLUMNS = ('timestamp', 'symbol', 'strategy', 'order_size', 'urgency', 'total_cost',
+           'cost_per_share', 'completion_time', 'volatility')
+
+class ExecutionDatabase:
+    """
+    SQLite store of execution results
+
+    Runs in WAL mode so readers never block the writer. Inserts go through a
+    background writer thread that drains a queue and commits each batch
+    with executemany, updating the daily_rollup table (per day and strategy)
+    in the same transaction, so analytics read precomputed aggregates.
+    close() (also registered with atexit) drains the queue before exit.
+    """
+
+    def __init__(self, db_path='executions.db', batch_size=500, flush_interval=0.5,
+                 max_queue=100000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        with closing(self.connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def record_execution(self, strategy, order_size, urgency, total_cost, cost_per_share,
+                         completion_time, symbol=None, volatility=None, timestamp=None):
+        """Queue one execution for the background writer"""
+        if self._closed:
+            raise RuntimeError("ExecutionDatabase is closed")
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
+        if not isinstance(timestamp, str):
+            timestamp = pd.Timestamp(timestamp)
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.tz_convert('UTC')
+            timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        values = [None if v is None else float(v) for v in
+                  (order_size, urgency, total_cost, cost_per_share, completion_time, volatility)]
+        self.queue.put((timestamp, symbol, strategy, *values))
+
+    def record_result(self, result, strategy, order_size, urgency, symbol=None,
+                      time_slice=1):
+        """Queue an AdvancedOptimalExecution.execute_large_order result"""
+        self.record_execution(strategy, order_size, urgency, result['total_cost'],
+                              result['cost_per_share'],
+                              len(result['optimal_schedule']) * time_slice, symbol,
+                              result['market_conditions']['volatility'])
+
+    def flush(self):
+        """Block until every queued execution is committed"""
+        self.queue.join()
+    
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self.queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        conn = self.connect()
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            rows = [row for row in batch if row is not None]
+            stopping = len(rows) < len(batch)
+            try:
+                if rows:
+                    self._write_batch(conn, rows)
+            except Exception as e:
+                # Keep the writer alive; only this batch is lost
+                print(f"❌ Failed to store {len(rows)} executions: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        conn.close()
+    
+    def _write_batch(self, conn, rows):
+        rollup = defaultdict(lambda: [0, 0.0, 0.0, 0.0, 0.0])
+        for timestamp, _, strategy, order_size, _, total_cost, cost_per_share, completion_time, _ in rows:
+            totals = rollup[(timestamp[:10], strategy)]
+            totals[0] += 1
+            totals[1] += order_size or 0.0
+            totals[2] += total_cost or 0.0
+            totals[3] += cost_per_share or 0.0
+            totals[4] += completion_time or 0.0
+
+        with conn:
+            conn.executemany(f'''
+                INSERT INTO executions ({", ".join(COLUMNS)})
+                VALUES ({", ".join("?" * len(COLUMNS))})
+            ''', rows)
+            conn.executemany('''
+                INSERT INTO daily_rollup VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (trade_date, strategy) DO UPDATE SET
+                    trade_count = trade_count + excluded.trade_count,
+                    total_shares = total_shares + excluded.total_shares,
+                    sum_cost = sum_cost + excluded.sum_cost,
+                    sum_cost_per_share = sum_cost_per_share + excluded.sum_cost_per_share,
+                    sum_completion_time = sum_completion_time + excluded.sum_completion_time
+            ''', [(day, strategy, *totals) for (day, strategy), totals in rollup.items()])
+
+    def get_performance_analytics(self, days=30):
+        """Per-strategy averages over the last `days` days, from the daily rollup"""
+        query = '''
+            SELECT
+                strategy,
+                SUM(trade_count) AS trade_count,
+                SUM(sum_cost) / SUM(trade_count) AS avg_cost,
+                SUM(sum_cost_per_share) / SUM(trade_count) AS avg_cost_per_share,
+                SUM(sum_completion_time) / SUM(trade_count) AS avg_completion_time
+            FROM daily_rollup
+            WHERE trade_date >= date('now', ?)
+            GROUP BY strategy
+            ORDER BY strategy
+        '''
+        with closing(self.connect()) as conn:
+            return pd.read_sql_query(query, conn, params=(f'-{days} days',))
+
+    def get_daily_performance(self, days=30):
+        """Per-day, per-strategy average cost per share, from the daily rollup"""
+        query = '''
+            SELECT
+                trade_date,
+                strategy,
+                sum_cost_per_share / trade_count AS daily_avg_cost
+            FROM daily_rollup
+            WHERE trade_date >= date('now', ?)
+            ORDER BY trade_date
+        '''
+        with closing(self.connect()) as conn:
+            return pd.read_sql_query(query, conn, params=(f'-{days} days',))
@@ -0,0 +1,78 @@
+import itertools
+import json
+import threading
+from collections import deque
+
+class Subscription:
+    """One client's bounded event buffer"""
+
+    def __init__(self, buffer_size):
+        self.events = deque(maxlen=buffer_size)
+        self.dropped = 0
+
+class EventBroadcaster:
+    """
+    Fans events out to any number of Server-Sent Events clients
+
+    publish() never blocks on clients: every subscriber has its own bounded
+    deque, and a client that falls behind loses its oldest events (reported
+    to it as a 'dropped' event) instead of stalling the publisher. Payloads
+    are JSON-encoded once per event, and all clients wait on one shared
+    condition rather than each having a dispatcher thread. stream() blocks
+    the thread that serves it, so a threaded WSGI server still spends one
+    thread per connected client, and every publish() wakes all of them.
+    """
+
+    def __init__(self, buffer_size=256, heartbeat=15.0, max_clients=1000):
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.subscriptions = set()
+        self._sequence = itertools.count(1)
+        self._condition = threading.Condition()
+
+    def subscribe(self):
+        """New Subscription, or None when max_clients are already connected"""
+        with self._condition:
+            if len(self.subscriptions) >= self.max_clients:
+                return None
+            subscription = Subscription(self.buffer_size)
+            self.subscriptions.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._condition:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event, data):
+        payload = json.dumps(data)
+        with self._condition:
+            message = (next(self._sequence), event, payload)
+            for subscription in self.subscriptions:
+                if len(subscription.events) == subscription.events.maxlen:
+                    subscription.dropped += 1
+                subscription.events.append(message)
+            self._condition.notify_all()
+
+    def stream(self, subscription):
+        """Generator of SSE-formatted messages for one client; unsubscribes on exit"""
+        try:
+            yield f"retry: {int(self.heartbeat * 1000)}\n\n"
+            while True:
+                with self._condition:
+                    if not subscription.events:
+                        self._condition.wait(self.heartbeat)
+                    events = list(subscription.events)
+                    subscription.events.clear()
+                    dropped, subscription.dropped = subscription.dropped, 0
+
+                if dropped:
+                    yield f"event: dropped\ndata: {json.dumps({'count': dropped})}\n\n"
+                if not events:
+                    # Comment line keeps proxies from timing out and detects disconnects
+                    yield ": keepalive\n\n"
+                else:
+                    yield ''.join(f"id: {sequence}\nevent: {event}\ndata: {payload}\n\n"
+                                  for sequence, event, payload in events)
+        finally:
+            self.unsubscribe(subscription)
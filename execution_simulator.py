@@ -0,0 +1,89 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from market_impact import MarketImpactModel, TRADING_MINUTES
+from risk_models import RiskModels
+from config import ExecutionConfig
+
+class ShortfallSimulator:
+    """
+    Monte Carlo implementation-shortfall simulator for an execution schedule
+    """
+
+    def __init__(self, config=None, max_chunk_bytes=64 * 1024**2, n_workers=1):
+        self.config = config or ExecutionConfig()
+        self.impact_model = MarketImpactModel(self.config)
+        self.risk_models = RiskModels(self.config)
+        self.max_chunk_bytes = max_chunk_bytes
+        self.n_workers = n_workers
+
+    def impact_costs(self, execution_schedule, average_volume, volatility):
+        """
+        Deterministic per-bucket impact cost, priced exactly as
+        MarketImpactModel.total_impact_cost so the simulated expected cost
+        matches the cost reported for the same schedule
+        """
+        return self.impact_model.bucket_impact_costs(
+            execution_schedule, average_volume, volatility)[0]
+
+    def chunk_size(self, n_buckets):
+        """Number of paths per chunk that keeps one chunk under max_chunk_bytes"""
+        return max(1, int(self.max_chunk_bytes // (8 * n_buckets)))
+
+    def simulate(self, execution_schedule, average_volume, volatility, n_paths=10000,
+                 confidence=0.95, seed=None, n_workers=None):
+        """
+        Simulate the implementation-shortfall distribution over n_paths
+
+        Prices follow an arithmetic random walk with per-bucket volatility
+        derived from the daily volatility. Paths are generated in chunks of at
+        most max_chunk_bytes, each from its own spawned seed, so results are
+        identical for any number of workers.
+        """
+        schedule = np.asarray(execution_schedule, dtype=float)
+        n_buckets = len(schedule)
+        if n_buckets == 0:
+            raise ValueError("Execution schedule is empty")
+        if n_paths < 1:
+            raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+        n_workers = n_workers or self.n_workers
+
+        bucket_volatility = volatility * np.sqrt(self.config.MIN_TIME_SLICE / TRADING_MINUTES)
+        impact_cost = np.sum(self.impact_costs(schedule, average_volume, volatility))
+
+        # A shock in bucket j moves the price paid on every share still held
+        holdings = np.sum(schedule) - np.concatenate(([0.0], np.cumsum(schedule)[:-1]))
+        exposure = bucket_volatility * holdings
+
+        chunk = self.chunk_size(n_buckets)
+        sizes = [chunk] * (n_paths // chunk)
+        if n_paths % chunk:
+            sizes.append(n_paths % chunk)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(exposure, size, seed_seq) for size, seed_seq in zip(sizes, seeds)]
+
+        if n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                chunks = list(pool.map(_simulate_chunk, tasks))
+        else:
+            chunks = [_simulate_chunk(task) for task in tasks]
+
+        shortfall = impact_cost + np.concatenate(chunks)
+        var, cvar = self.risk_models.empirical_var_cvar(shortfall, confidence)
+
+        return {
+            'shortfall': shortfall,
+            'expected_cost': impact_cost,
+            'mean': shortfall.mean(),
+            'std': shortfall.std(),
+            'var': var,
+            'cvar': cvar,
+            'confidence': confidence,
+            'n_paths': n_paths
+        }
+
+def _simulate_chunk(task):
+    """Price-risk component of shortfall for one chunk of paths"""
+    exposure, n_paths, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    shocks = rng.standard_normal((n_paths, len(exposure)))
+    return shocks @ exposure
@@ -86,4 +86,84 @@ class ExecutionStrategies:
             historical_vol = np.ones(time_buckets)  # Default pattern
             return self.volume_weighted_average_price(total_shares, 
                                                      time_buckets,
-                                                     historical_vol)
\ No newline at end of file
+                                                     historical_vol)
+    
+    def schedule_batch(self, total_shares, urgencies, strategies, market_conditions,
+                       volume_profiles=None):
+        """
+        Schedules for many orders at once, matching the per-order strategies
+        
+        total_shares, urgencies and strategies are per-order sequences;
+        market_conditions maps 'average_volume' and 'momentum' to per-order
+        arrays; volume_profiles is an (n_orders, n_minutes) array (only read
+        for 'vwap' orders). Returns an (n_orders, n_buckets) array,
+        zero-padded after each order's last bucket, and the number of
+        buckets per order.
+        """
+        total_shares = np.asarray(total_shares, dtype=float)
+        urgencies = np.asarray(urgencies, dtype=float)
+        strategies = np.asarray(strategies, dtype=object)
+        n_orders = len(total_shares)
+        full_steps = max(1, self.config.TIME_HORIZON // self.config.MIN_TIME_SLICE)
+        
+        average_volume = np.broadcast_to(
+            market_conditions.get('average_volume', total_shares * 10), (n_orders,))
+        momentum = np.broadcast_to(market_conditions.get('momentum', 0.0), (n_orders,))
+        
+        is_vwap = strategies == 'vwap'
+        is_shortfall = strategies == 'implementation_shortfall'
+        is_adaptive = ~(is_vwap | is_shortfall | (strategies == 'twap'))
+        
+        # Adaptive orders become shortfall (half horizon when urgent), or TWAP
+        shortfall_steps = np.where(is_shortfall, full_steps, 0)
+        shortfall_steps = np.where(is_adaptive & (urgencies > 0.8),
+                                   max(1, self.config.TIME_HORIZON // 2 // self.config.MIN_TIME_SLICE),
+                                   shortfall_steps)
+        shortfall_steps = np.where(is_adaptive & (urgencies <= 0.8) & (momentum > 0),
+                                   full_steps, shortfall_steps)
+        uses_shortfall = shortfall_steps > 0
+        
+        vwap_steps = 0
+        if is_vwap.any():
+            profiles = np.atleast_2d(np.asarray(volume_profiles, dtype=float))
+            vwap_steps = profiles.shape[1] // self.config.MIN_TIME_SLICE
+        
+        n_buckets = np.where(uses_shortfall, shortfall_steps, full_steps)
+        n_buckets = np.where(is_vwap, vwap_steps, n_buckets)
+        schedules = np.zeros((n_orders, max(full_steps, vwap_steps)))
+        
+        # TWAP (and adaptive orders with a flat default profile)
+        flat = ~(is_vwap | uses_shortfall)
+        schedules[flat, :full_steps] = (total_shares[flat] / full_steps)[:, None]
+        
+        if is_vwap.any():
+            # One profile per order, or a single profile shared by all
+            if len(profiles) == n_orders:
+                profiles = profiles[is_vwap]
+            weights = profiles[:, :vwap_steps]
+            weights = weights / weights.sum(axis=1, keepdims=True)
+            schedules[is_vwap, :vwap_steps] = total_shares[is_vwap, None] * weights
+        
+        if uses_shortfall.any():
+            rows = np.flatnonzero(uses_shortfall)
+            schedules[rows] = self._shortfall_batch(
+                total_shares[rows], urgencies[rows], shortfall_steps[rows],
+                average_volume[rows], schedules.shape[1])
+        
+        return schedules, n_buckets
+    
+    def _shortfall_batch(self, total_shares, urgencies, n_steps, average_volume, width):
+        """implementation_shortfall_simple for many orders, stepping all of them together"""
+        decay_rate = np.where(urgencies > 0.8, 0.8, np.where(urgencies > 0.5, 0.5, 0.2))
+        cap = average_volume * self.config.MAX_POSITION_CHANGE
+        schedules = np.zeros((len(total_shares), width))
+        remaining = total_shares.copy()
+        
+        for i in range(int(n_steps.max())):
+            shares = np.minimum(remaining * decay_rate / n_steps, cap)
+            shares = np.where(i == n_steps - 1, remaining, shares)
+            shares = np.where(i < n_steps, shares, 0.0)
+            schedules[:, i] = shares
+            remaining = remaining - shares
+        
+        return schedules
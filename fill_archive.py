@@ -0,0 +1,118 @@
+import os
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITIONING = ds.partitioning(pa.schema([('date', pa.string()), ('strategy', pa.string())]),
+                               flavor='hive')
+
+class FillArchive:
+    """
+    Columnar archive of execution results, partitioned by date and strategy
+
+    Files live under <root_dir>/date=YYYY-MM-DD/strategy=<name>/ as Parquet.
+    Reads go through a pyarrow dataset, so a query only opens the partitions
+    matching its day range and strategies, only decodes the columns it asks
+    for, and streams record batches instead of loading the archive.
+    """
+
+    def __init__(self, root_dir='fill_archive'):
+        self.root_dir = root_dir
+
+    def append(self, fills):
+        """Write a DataFrame of fills (needs a timestamp and strategy column)"""
+        fills = pd.DataFrame(fills)
+        if fills.empty:
+            return
+        fills = fills.assign(date=pd.to_datetime(fills['timestamp']).dt.strftime('%Y-%m-%d'))
+        n_partitions = len(fills.groupby(['date', 'strategy']).size())
+        ds.write_dataset(pa.Table.from_pandas(fills, preserve_index=False), self.root_dir,
+                         format='parquet', partitioning=PARTITIONING,
+                         max_partitions=max(1024, n_partitions),
+                         basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                         existing_data_behavior='overwrite_or_ignore')
+
+    def archive_database(self, db, day):
+        """Copy one day (YYYY-MM-DD) of executions from an ExecutionDatabase"""
+        with closing(db.connect()) as conn:
+            fills = pd.read_sql_query(
+                "SELECT * FROM executions WHERE timestamp >= ? AND timestamp < date(?, '+1 day')",
+                conn, params=(day, day))
+        self.append(fills.drop(columns='id'))
+        return len(fills)
+
+    def _filter(self, days=None, strategies=None):
+        expression = None
+        if days is not None:
+            start = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
+            expression = ds.field('date') >= start
+        if strategies is not None:
+            chosen = ds.field('strategy').isin(list(strategies))
+            expression = chosen if expression is None else expression & chosen
+        return expression
+
+    def scan(self, columns, days=None, strategies=None, batch_size=1 << 17):
+        """Stream record batches of the requested columns for matching partitions"""
+        if not os.path.isdir(self.root_dir):
+            return
+        dataset = ds.dataset(self.root_dir, format='parquet', partitioning=PARTITIONING)
+        for batch in dataset.to_batches(columns=list(columns), batch_size=batch_size,
+                                        filter=self._filter(days, strategies)):
+            if batch.num_rows:
+                yield batch
+
+    def aggregate(self, keys, aggregations, days=None, strategies=None, chunk_rows=1 << 20):
+        """
+        Grouped sums/counts over matching fills, computed in Arrow on chunks of
+        at most chunk_rows so memory stays bounded; returns a DataFrame
+        indexed by keys with one '<column>_<function>' column per aggregation
+        """
+        columns = list(dict.fromkeys(list(keys) + [column for column, _ in aggregations]))
+        totals = None
+        pending, pending_rows = [], 0
+
+        def flush():
+            table = pa.Table.from_batches(pending)
+            partial = table.group_by(list(keys)).aggregate(aggregations).to_pandas()
+            partial = partial.set_index(list(keys))
+            return partial if totals is None else totals.add(partial, fill_value=0)
+
+        for batch in self.scan(columns, days, strategies):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= chunk_rows:
+                totals = flush()
+                pending, pending_rows = [], 0
+        if pending:
+            totals = flush()
+        return totals
+
+    def get_performance_analytics(self, days=30, strategies=None):
+        """Per-strategy averages, same shape as ExecutionDatabase.get_performance_analytics"""
+        sums = self.aggregate(['strategy'], [('total_cost', 'count'), ('total_cost', 'sum'),
+                                             ('cost_per_share', 'sum'),
+                                             ('completion_time', 'sum')], days, strategies)
+        if sums is None:
+            return pd.DataFrame(columns=['strategy', 'trade_count', 'avg_cost',
+                                         'avg_cost_per_share', 'avg_completion_time'])
+        count = sums['total_cost_count']
+        return pd.DataFrame({
+            'trade_count': count.astype(int),
+            'avg_cost': sums['total_cost_sum'] / count,
+            'avg_cost_per_share': sums['cost_per_share_sum'] / count,
+            'avg_completion_time': sums['completion_time_sum'] / count
+        }).sort_index().reset_index()
+
+    def get_daily_performance(self, days=30, strategies=None):
+        """Per-day, per-strategy average cost per share"""
+        sums = self.aggregate(['date', 'strategy'], [('cost_per_share', 'count'),
+                                                     ('cost_per_share', 'sum')],
+                              days, strategies)
+        if sums is None:
+            return pd.DataFrame(columns=['trade_date', 'strategy', 'daily_avg_cost'])
+        daily = (sums['cost_per_share_sum'] / sums['cost_per_share_count']).rename('daily_avg_cost')
+        daily = daily.sort_index().reset_index()
+        return daily.rename(columns={'date': 'trade_date'})
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+class Job:
+    """One unit of queued work with its status, result and timing"""
+
+    def __init__(self, fn, args, kwargs, params=None, job_id=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.params = params or {}
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        timing = {'submitted_at': self.submitted_at, 'started_at': self.started_at,
+                  'finished_at': self.finished_at, 'queue_seconds': None, 'run_seconds': None}
+        if self.started_at is not None:
+            timing['queue_seconds'] = self.started_at - self.submitted_at
+        if self.finished_at is not None:
+            timing['run_seconds'] = self.finished_at - self.started_at
+        return {'job_id': self.id, 'status': self.status, 'params': self.params,
+                'result': self.result, 'error': self.error, 'timing': timing}
+
+class JobQueue:
+    """
+    Fixed pool of worker threads fed from a bounded queue
+
+    submit() raises queue.Full instead of blocking once max_queue jobs are
+    waiting, so callers can shed load. Finished jobs are kept for lookup by
+    id, up to max_finished (oldest evicted first).
+    """
+
+    def __init__(self, n_workers=4, max_queue=100, max_finished=1000):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.max_finished = max_finished
+        self.jobs = {}
+        self._finished = deque()
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(n_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn, *args, params=None, job_id=None, **kwargs):
+        """Queue fn(*args, **kwargs); returns the Job or raises queue.Full"""
+        job = Job(fn, args, kwargs, params, job_id)
+        with self._lock:
+            self.queue.put_nowait(job)
+            self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'workers': len(self._workers), 'queued': self.queue.qsize(),
+                'capacity': self.queue.maxsize, 'jobs': counts}
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+                job.status = 'completed'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                job.done.set()
+                self.queue.task_done()
+                with self._lock:
+                    self._finished.append(job.id)
+                    while len(self._finished) > self.max_finished:
+                        self.jobs.pop(self._finished.popleft(), None)
@@ -1,17 +1,24 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from execution_strategies import ExecutionStrategies
 from risk_models import RiskModels
 from data_feed import MarketDataFeed
 from market_impact import MarketImpactModel
+from execution_simulator import ShortfallSimulator
+from ml_impact_predictor import MLImpactPredictor as BaseMLImpactPredictor
+from online_learning import OnlineImpactLearner
+from portfolio_execution import MultiAssetAlmgrenChriss
 from config import ExecutionConfig
 
-class MLImpactPredictor:
-    def __init__(self):
-        from sklearn.ensemble import RandomForestRegressor
-        self.model = RandomForestRegressor(n_estimators=50, random_state=42)
-        self.is_trained = False
+class MLImpactPredictor(BaseMLImpactPredictor):
+    FEATURES = ['order_size', 'urgency', 'volatility', 'volume_ratio']
+    MODEL_NAME = 'impact_rf_basic'
+    SPLIT_RANDOM_STATE = 42
+    
+    def __init__(self, model_version=None, store=None):
+        super().__init__(n_estimators=50, model_version=model_version, store=store)
         
     def generate_training_data(self, n_samples=5000):
         """Generate synthetic training data for market impact"""
@@ -33,36 +40,10 @@ class MLImpactPredictor:
         )
         
         return pd.DataFrame(data)
-    
-    def train_model(self):
-        """Train the ML model"""
-        print("Training ML impact prediction model...")
-        data = self.generate_training_data()
-        
-        X = data[['order_size', 'urgency', 'volatility', 'volume_ratio']]
-        y = data['impact_cost']
-        
-        from sklearn.model_selection import train_test_split
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        self.model.fit(X_train, y_train)
-        
-        score = self.model.score(X_test, y_test)
-        print(f"Model trained with R² score: {score:.3f}")
-        self.is_trained = True
-        
-    def predict_impact(self, order_features):
-        """Predict market impact for new order"""
-        if not self.is_trained:
-            self.train_model()
-            
-        # Ensure features are in correct order
-        feature_names = ['order_size', 'urgency', 'volatility', 'volume_ratio']
-        prediction = self.model.predict([order_features])[0]
-        return max(0, prediction)
 
 class PortfolioExecution:
-    def __init__(self):
-        pass
+    def __init__(self, config=None, covariance_estimator=None):
+        self.trajectory_solver = MultiAssetAlmgrenChriss(config, covariance_estimator)
         
     def optimize_portfolio_execution(self, orders):
         """
@@ -84,6 +65,31 @@ class PortfolioExecution:
             }
         
         return results
+    
+    def optimize_portfolio_trajectories(self, orders, covariance=None, risk_aversion=None):
+        """
+        Joint Almgren-Chriss trajectories across the basket under covariance
+        """
+        print("🔄 Solving joint portfolio trajectories...")
+        
+        solution = self.trajectory_solver.optimal_trajectories(
+            orders, covariance, risk_aversion)
+        shares = np.array([order['size'] for order in orders], dtype=float)
+        
+        # Report when 95% of each order is done; AC only reaches zero at the horizon
+        done = solution['holdings'] <= 0.05 * shares[:, None]
+        completion = solution['time_grid'][np.argmax(done, axis=1)]
+        
+        results = {}
+        for i, order in enumerate(orders):
+            results[order['symbol']] = {
+                'allocation': shares[i] / shares.sum(),
+                'execution_time': completion[i],
+                'estimated_cost': solution['name_costs'][i],
+                'schedule': solution['schedules'][i]
+            }
+        
+        return results
 
 class AdvancedOptimalExecution:
     """
@@ -96,12 +102,25 @@ class AdvancedOptimalExecution:
         self.risk_models = RiskModels(self.config)
         self.data_feed = MarketDataFeed()
         self.impact_model = MarketImpactModel(self.config)
+        self.simulator = ShortfallSimulator(self.config)
         self.ml_predictor = MLImpactPredictor()
-        self.portfolio_optimizer = PortfolioExecution()
-        
-    def execute_large_order(self, order_size, urgency, strategy_type='adaptive'):
+        self.online_learner = None
+        self.execution_db = None
+        self.portfolio_optimizer = PortfolioExecution(self.config)
+    
+    def enable_online_learning(self, **learner_options):
+        """Feed realized ML-enhanced execution costs back into the impact model"""
+        if self.online_learner is None:
+            self.online_learner = OnlineImpactLearner(self.ml_predictor, **learner_options)
+        return self.online_learner.start()
+        
+    def execute_large_order(self, order_size, urgency, strategy_type='adaptive',
+                            n_paths=0, symbol=None):
         """
         Execute large order with minimal market impact
+
+        With n_paths > 0 the result also carries a Monte Carlo
+        implementation-shortfall distribution under 'shortfall_distribution'.
         """
         print(f"Executing order: {order_size:,} shares, Urgency: {urgency:.2f}, Strategy: {strategy_type}")
         
@@ -110,9 +129,47 @@ class AdvancedOptimalExecution:
         volatility = market_conditions['volatility']
         average_volume = market_conditions['average_volume']
         
+        optimal_schedule, total_cost = self.plan_execution(
+            order_size, urgency, strategy_type, market_conditions, symbol=symbol)
+        
+        # Risk analysis
+        risk_analysis = self.risk_models.stress_test_scenarios(
+            optimal_schedule, {
+                'normal': market_conditions,
+                'high_vol': {**market_conditions, 'volatility_scale': 2.0},
+                'low_liquidity': {**market_conditions, 'volume_change': 0.5}
+            }
+        )
+        
+        result = {
+            'optimal_schedule': optimal_schedule,
+            'total_cost': total_cost,
+            'cost_per_share': total_cost / order_size,
+            'risk_analysis': risk_analysis,
+            'market_conditions': market_conditions
+        }
+        
+        if self.execution_db is not None:
+            self.execution_db.record_result(result, strategy_type, order_size, urgency, symbol,
+                                            self.config.MIN_TIME_SLICE)
+        
+        if n_paths:
+            result['shortfall_distribution'] = self.simulator.simulate(
+                optimal_schedule, average_volume, volatility, n_paths=n_paths)
+        
+        return result
+    
+    def plan_execution(self, order_size, urgency, strategy_type, market_conditions, rng=None,
+                       symbol=None):
+        """
+        Build the execution schedule and its impact cost for one order
+        """
+        volatility = market_conditions['volatility']
+        average_volume = market_conditions['average_volume']
+        
         # Select execution strategy
         if strategy_type == 'vwap':
-            historical_vol = self.data_feed.get_historical_volume(1)[0]
+            historical_vol = self.data_feed.get_volume_profile(symbol, rng=rng)
             time_buckets = len(historical_vol) // self.config.MIN_TIME_SLICE
             optimal_schedule = self.strategies.volume_weighted_average_price(
                 order_size, time_buckets, historical_vol)
@@ -138,24 +195,52 @@ class AdvancedOptimalExecution:
         
         # Calculate costs
         total_cost = self.impact_model.total_impact_cost(optimal_schedule, average_volume, volatility)
-        
-        # Risk analysis
-        risk_analysis = self.risk_models.stress_test_scenarios(
-            optimal_schedule, {
-                'normal': market_conditions,
-                'high_vol': {**market_conditions, 'volatility_scale': 2.0},
-                'low_liquidity': {**market_conditions, 'volume_change': 0.5}
-            }
-        )
-        
+        return optimal_schedule, total_cost
+    
+    def plan_execution_batch(self, order_sizes, urgencies, strategy_types, symbols=None,
+                             rng=None):
+        """
+        Schedules and impact costs for many orders in one vectorized pass
+
+        Market conditions come from the per-symbol universe snapshot (orders
+        without a symbol get their own fresh draw) and VWAP orders share one
+        volume profile per symbol. Returns columnar arrays; schedules is
+        zero-padded past each order's n_buckets.
+        """
+        order_sizes = np.asarray(order_sizes, dtype=float)
+        strategy_types = np.asarray(strategy_types, dtype=object)
+        n_orders = len(order_sizes)
+        symbols = list(symbols) if symbols is not None else [None] * n_orders
+        conditions = self.data_feed.get_universe_conditions(symbols, rng)
+        unnamed = [i for i, symbol in enumerate(symbols) if symbol is None]
+        if unnamed:
+            fresh = self.data_feed._compute_conditions([None] * len(unnamed), rng)
+            for field, values in conditions.items():
+                values[unnamed] = fresh[field]
+
+        profiles = None
+        vwap_rows = np.flatnonzero(strategy_types == 'vwap')
+        if len(vwap_rows):
+            by_symbol = {symbol: self.data_feed.get_volume_profile(symbol, rng=rng)
+                         for symbol in {symbols[i] for i in vwap_rows}}
+            profiles = np.ones((n_orders, len(next(iter(by_symbol.values())))))
+            profiles[vwap_rows] = [by_symbol[symbols[i]] for i in vwap_rows]
+
+        schedules, n_buckets = self.strategies.schedule_batch(
+            order_sizes, urgencies, strategy_types, conditions, profiles)
+        total_cost = self.impact_model.total_impact_cost_batch(
+            schedules, conditions['average_volume'], conditions['volatility'])
+
         return {
-            'optimal_schedule': optimal_schedule,
+            'schedules': schedules,
+            'n_buckets': n_buckets,
             'total_cost': total_cost,
-            'cost_per_share': total_cost / order_size,
-            'risk_analysis': risk_analysis,
-            'market_conditions': market_conditions
+            'cost_per_share': total_cost / order_sizes,
+            'completion_time': n_buckets * self.config.MIN_TIME_SLICE,
+            'volatility': conditions['volatility'],
+            'average_volume': conditions['average_volume']
         }
-    
+
     def ml_enhanced_execution(self, order_size, urgency, symbol="AAPL"):
         """Use ML to enhance execution decisions"""
         print("\n🤖 ML-ENHANCED EXECUTION ANALYSIS")
@@ -172,7 +257,7 @@ class AdvancedOptimalExecution:
         ]
         
         # Get ML impact prediction
-        ml_impact = self.ml_predictor.predict_impact(order_features)
+        ml_impact = self.ml_predictor.predict_impact_cached(order_features)
         print(f"ML Predicted Impact: ${ml_impact:,.2f}")
         
         # Use ML insight to adjust strategy
@@ -183,14 +268,24 @@ class AdvancedOptimalExecution:
             print("🔍 ML suggests using AGGRESSIVE execution (Implementation Shortfall)")
             strategy_type = 'implementation_shortfall'
         
-        return self.execute_large_order(order_size, urgency, strategy_type)
+        result = self.execute_large_order(order_size, urgency, strategy_type, symbol=symbol)
+        
+        if self.online_learner is not None:
+            self.online_learner.record_execution(order_features, result['total_cost'])
+        
+        return result
     
-    def portfolio_level_execution(self, portfolio_orders):
+    def portfolio_level_execution(self, portfolio_orders, joint_trajectories=False,
+                                  covariance=None):
         """Optimize execution across multiple stocks"""
         print("\n📊 PORTFOLIO EXECUTION OPTIMIZATION")
         print("-" * 40)
         
-        result = self.portfolio_optimizer.optimize_portfolio_execution(portfolio_orders)
+        if joint_trajectories:
+            result = self.portfolio_optimizer.optimize_portfolio_trajectories(
+                portfolio_orders, covariance)
+        else:
+            result = self.portfolio_optimizer.optimize_portfolio_execution(portfolio_orders)
         
         print("Optimal Portfolio Execution Schedule:")
         total_cost = 0
@@ -225,6 +320,42 @@ class AdvancedOptimalExecution:
                 
         return results
     
+    def sweep_strategies(self, order_sizes, urgencies, strategies=None, n_workers=1,
+                         seed=None):
+        """
+        Evaluate every (order_size, urgency, strategy) combination on a process pool
+        
+        Each (order_size, urgency) cell draws its market conditions from its
+        own spawned seed, shared by all strategies in that cell, so results
+        are reproducible and independent of n_workers.
+        """
+        strategies = strategies or ['adaptive', 'vwap', 'twap', 'implementation_shortfall']
+        cells = [(size, urgency) for size in order_sizes for urgency in urgencies]
+        cell_seeds = np.random.SeedSequence(seed).spawn(len(cells))
+        tasks = [(size, urgency, strategy, cell_seed)
+                 for (size, urgency), cell_seed in zip(cells, cell_seeds)
+                 for strategy in strategies]
+        
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                rows = list(pool.map(_sweep_task, tasks,
+                                     chunksize=max(1, len(tasks) // (4 * n_workers))))
+        else:
+            rows = [self._evaluate_sweep_task(task) for task in tasks]
+        
+        return pd.DataFrame(rows, columns=['order_size', 'urgency', 'strategy', 'total_cost',
+                                           'cost_per_share', 'completion_time'])
+    
+    def _evaluate_sweep_task(self, task):
+        """Quiet, seeded evaluation of one sweep combination"""
+        order_size, urgency, strategy, cell_seed = task
+        rng = np.random.default_rng(cell_seed)
+        market_conditions = self.data_feed.get_market_conditions(rng)
+        schedule, total_cost = self.plan_execution(order_size, urgency, strategy,
+                                                   market_conditions, rng)
+        return (order_size, urgency, strategy, total_cost, total_cost / order_size,
+                len(schedule) * self.config.MIN_TIME_SLICE)
+    
     def run_comprehensive_analysis(self):
         """Run full analysis with all advanced features"""
         print("🚀 RUNNING COMPREHENSIVE ANALYSIS")
@@ -350,6 +481,15 @@ class AdvancedOptimalExecution:
         plt.savefig('advanced_execution_dashboard.png', dpi=300, bbox_inches='tight')
         plt.show()
 
+_sweep_engine = None
+
+def _sweep_task(task):
+    """Process-pool entry point for AdvancedOptimalExecution.sweep_strategies"""
+    global _sweep_engine
+    if _sweep_engine is None:
+        _sweep_engine = AdvancedOptimalExecution()
+    return _sweep_engine._evaluate_sweep_task(task)
+
 def main():
     """Run the advanced optimal execution system"""
     print("🚀 ADVANCED OPTIMAL EXECUTION WITH AI")
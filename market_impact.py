@@ -1,7 +1,11 @@
 import numpy as np
+from functools import lru_cache
 from scipy.optimize import minimize
 from config import ExecutionConfig
 
+TRADING_MINUTES = 390
+FRONTIER_CACHE_SIZE = 256
+
 class MarketImpactModel:
     """
     Models permanent and temporary market impact of large orders
@@ -29,44 +33,131 @@ class MarketImpactModel:
         """
         Calculate total market impact cost for an execution schedule
         """
-        total_cost = 0
-        remaining_shares = sum(execution_schedule)
+        return self.total_impact_cost_batch(
+            [execution_schedule], average_volume, volatility)[0]
+    
+    def total_impact_cost_batch(self, execution_schedules, average_volumes, volatilities):
+        """
+        Calculate total market impact cost for many execution schedules at once
+
+        execution_schedules is an (n_schedules, n_buckets) array; average_volumes
+        and volatilities are scalars or per-schedule vectors of length n_schedules.
+        Returns a vector of n_schedules costs.
+        """
+        return np.sum(self.bucket_impact_costs(execution_schedules, average_volumes,
+                                               volatilities), axis=1)
+    
+    def bucket_impact_costs(self, execution_schedules, average_volumes, volatilities):
+        """
+        Impact cost of every bucket, shape (n_schedules, n_buckets); same
+        arguments as total_impact_cost_batch
+        """
+        schedules = np.atleast_2d(np.asarray(execution_schedules, dtype=float))
+        n_schedules = schedules.shape[0]
+        
+        average_volumes = np.broadcast_to(
+            np.asarray(average_volumes, dtype=float), (n_schedules,))[:, None]
+        volatilities = np.broadcast_to(
+            np.asarray(volatilities, dtype=float), (n_schedules,))[:, None]
         
-        for i, shares in enumerate(execution_schedule):
-            volume_frac = shares / average_volume
-            time_frac = i / len(execution_schedule)
-            
-            # Permanent impact accumulates
-            perm_impact = self.permanent_impact(volume_frac, volatility)
-            
-            # Temporary impact for this trade
-            temp_impact = self.temporary_impact(shares, average_volume, volatility)
-            
-            # Impact on remaining shares
-            cost = shares * (perm_impact + temp_impact)
-            total_cost += cost
-            
-            remaining_shares -= shares
-            
-        return total_cost
+        volume_frac = schedules / average_volumes
+        perm_impact = self.permanent_impact(volume_frac, volatilities)
+        temp_impact = self.temporary_impact(schedules, average_volumes, volatilities)
+        
+        return schedules * (perm_impact + temp_impact)
     
-    def almgren_chriss_optimal(self, total_shares, time_horizon, volatility, 
-                              average_volume, risk_aversion):
+    def impact_coefficients(self, total_shares, time_horizon, volatility, average_volume):
         """
-        Implement Almgren-Chriss optimal execution model
+        Linear Almgren-Chriss impact coefficients (eta, gamma) for this model
+
+        gamma is the permanent price move per share traded. eta linearises the
+        square-root temporary impact around a uniform (TWAP) trading rate.
         """
         n_steps = max(1, time_horizon // self.config.MIN_TIME_SLICE)
-        time_points = np.linspace(0, 1, n_steps)
+        tau = time_horizon / n_steps
+        twap_shares = total_shares / n_steps
         
-        # Exponential decay schedule
-        optimal_schedule = []
-        remaining = total_shares
+        gamma = self.config.PERMANENT_IMPACT_FACTOR * volatility / average_volume
+        eta = (self.temporary_impact(twap_shares, average_volume, volatility) *
+               tau / twap_shares)
+        return eta, gamma
+    
+    def almgren_chriss_optimal(self, total_shares, time_horizon, volatility, 
+                              average_volume, risk_aversion):
+        """
+        Implement Almgren-Chriss optimal execution model
         
-        for t in time_points[:-1]:
-            shares = total_shares * np.exp(-risk_aversion * t) / n_steps
-            shares = min(shares, remaining)
-            optimal_schedule.append(shares)
-            remaining -= shares
+        Returns the closed-form sinh/kappa trade list (shares per time slice)
+        for a single risk aversion.
+        """
+        eta, gamma = self.impact_coefficients(total_shares, time_horizon,
+                                              volatility, average_volume)
+        frontier = self.efficient_frontier(total_shares, time_horizon, volatility,
+                                           eta, gamma, [risk_aversion])
+        return frontier['schedules'][0].copy()
+    
+    def efficient_frontier(self, total_shares, time_horizon, volatility, eta, gamma,
+                           risk_aversions):
+        """
+        Almgren-Chriss efficient frontier over a grid of risk aversions
         
-        optimal_schedule.append(remaining)
-        return np.array(optimal_schedule)
\ No newline at end of file
+        Returns a dict of arrays aligned to risk_aversions: expected_cost,
+        variance, kappa, plus the holdings (n_lambda x n_steps+1) and
+        schedules (n_lambda x n_steps). Results are cached per
+        (shares, horizon, volatility, eta, gamma, grid) and read-only.
+        """
+        n_steps = max(1, time_horizon // self.config.MIN_TIME_SLICE)
+        risk_aversions = tuple(float(l) for l in np.atleast_1d(risk_aversions))
+        return _efficient_frontier(float(total_shares), int(n_steps),
+                                   float(time_horizon), float(volatility),
+                                   float(eta), float(gamma), risk_aversions)
+
+
+def holdings_ratio(kappa, t, time_horizon):
+    """
+    Almgren-Chriss fraction of the order still held, sinh(kappa (T - t)) / sinh(kappa T)
+
+    Written with exponentials so large kappa * T does not overflow; kappa -> 0
+    is the linear TWAP limit. kappa is a column vector, t a row of times.
+    """
+    positive = kappa > 0
+    safe_kappa = np.where(positive, kappa, 1.0)
+    ratio = (np.exp(-safe_kappa * t) *
+             np.expm1(-2 * safe_kappa * (time_horizon - t)) /
+             np.expm1(-2 * safe_kappa * time_horizon))
+    return np.where(positive, ratio, (time_horizon - t) / time_horizon)
+
+
+@lru_cache(maxsize=FRONTIER_CACHE_SIZE)
+def _efficient_frontier(total_shares, n_steps, time_horizon, volatility, eta, gamma,
+                        risk_aversions):
+    """Vectorised discrete-time Almgren-Chriss solution (time in minutes)"""
+    tau = time_horizon / n_steps
+    sigma = volatility / np.sqrt(TRADING_MINUTES)
+    eta_tilde = eta - 0.5 * gamma * tau
+    if eta_tilde <= 0:
+        raise ValueError("Temporary impact eta must exceed gamma * tau / 2")
+    
+    lambdas = np.asarray(risk_aversions, dtype=float)[:, None]
+    kappa_tilde_sq = lambdas * sigma**2 / eta_tilde
+    kappa = np.arccosh(1 + 0.5 * kappa_tilde_sq * tau**2) / tau
+    
+    t = np.arange(n_steps + 1) * tau
+    holdings = total_shares * holdings_ratio(kappa, t, time_horizon)
+    schedules = -np.diff(holdings, axis=1)
+    
+    expected_cost = (0.5 * gamma * total_shares**2 +
+                     eta_tilde / tau * np.sum(schedules**2, axis=1))
+    variance = sigma**2 * tau * np.sum(holdings[:, 1:]**2, axis=1)
+    
+    frontier = {
+        'risk_aversion': lambdas[:, 0],
+        'kappa': kappa[:, 0],
+        'expected_cost': expected_cost,
+        'variance': variance,
+        'holdings': holdings,
+        'schedules': schedules
+    }
+    for values in frontier.values():
+        values.setflags(write=False)
+    return frontier
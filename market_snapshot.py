@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+def _json_default(value):
+    # NumPy arrays and scalars
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+class MarketSnapshot:
+    """Immutable, pre-serialized market analysis served to every request"""
+
+    def __init__(self, data, etag, as_of):
+        self.data = data
+        self.etag = etag
+        self.as_of = as_of
+        self.body = json.dumps({**data, 'timestamp': as_of},
+                               default=_json_default).encode()
+
+class MarketSnapshotCache:
+    """
+    Market conditions and hidden-liquidity analysis refreshed in the background
+
+    One daemon thread per process recomputes the analysis every `interval`
+    seconds and swaps in a new MarketSnapshot; requests only read the current
+    one, so their latency does not depend on the analysis cost. The ETag is
+    a hash of the analysis itself, so a refresh that changes nothing keeps
+    the old snapshot (and ETag) and clients get 304s. If a refresh fails the
+    previous snapshot keeps being served. The thread is (re)started lazily,
+    which also covers worker processes forked from a preloaded app.
+    """
+
+    def __init__(self, data_feed, interval=1.0):
+        self.data_feed = data_feed
+        self.interval = interval
+        self.snapshot = None
+        self.refreshes = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def compute(self):
+        return {
+            'market_conditions': self.data_feed.get_market_conditions(),
+            'hidden_liquidity': self.data_feed.estimate_hidden_liquidity()
+        }
+
+    def refresh(self):
+        data = self.compute()
+        etag = hashlib.sha1(json.dumps(data, sort_keys=True, default=_json_default)
+                            .encode()).hexdigest()
+        if self.snapshot is None or etag != self.snapshot.etag:
+            self.snapshot = MarketSnapshot(data, etag, time.strftime('%Y-%m-%dT%H:%M:%S'))
+        self.refreshes += 1
+        return self.snapshot
+
+    def get(self):
+        """Current snapshot, starting this process's refresher if needed"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.refresh()
+                    threading.Thread(target=self._run, daemon=True).start()
+                    self._pid = os.getpid()
+        return self.snapshot
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = e
@@ -1,12 +1,43 @@
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
+import os
+import time
+import queue
+import threading
+import math
+from collections import OrderedDict
+from concurrent.futures import Future
 import numpy as np
 import pandas as pd
+from model_store import ModelArtifactStore
+from compiled_forest import CompiledForest
 
 class MLImpactPredictor:
-    def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+    FEATURES = ['order_size', 'urgency', 'volatility', 'market_cap', 'volume_ratio', 'spread']
+    MODEL_NAME = 'impact_rf'
+    SPLIT_RANDOM_STATE = None
+    
+    def __init__(self, n_estimators=100, model_version=None, store=None, n_jobs=None,
+                 max_depth=10):
+        """
+        Loads the latest stored model (or the pinned model_version, also
+        settable through the <MODEL_NAME>_VERSION environment variable, e.g.
+        IMPACT_RF_VERSION) and only trains when no artifact exists.
+        
+        max_depth bounds the trees: compiled scoring takes one vectorized step
+        per level, and unbounded trees on the synthetic data grow ~50 deep.
+        """
+        self.model = RandomForestRegressor(n_estimators=n_estimators, random_state=42,
+                                           n_jobs=n_jobs, max_depth=max_depth)
+        self.n_jobs = n_jobs
         self.is_trained = False
+        self.store = store or ModelArtifactStore()
+        self.model_version = model_version or os.environ.get(f"{self.MODEL_NAME.upper()}_VERSION")
+        self.metadata = None
+        self.base_version = None
+        self.compiled_forest = None
+        self.prediction_cache = PredictionCache()
+        self.load_model()
         
     def generate_training_data(self, n_samples=10000):
         """Generate synthetic training data for market impact"""
@@ -31,25 +62,267 @@ class MLImpactPredictor:
         
         return pd.DataFrame(data)
     
+    def load_model(self):
+        """Load the stored model artifact; returns False if none exists"""
+        try:
+            model, metadata = self.store.load(self.MODEL_NAME, self.model_version)
+        except FileNotFoundError:
+            if self.model_version is not None:
+                raise
+            return False
+        
+        if metadata['features'] != self.FEATURES:
+            raise ValueError(f"Stored model {metadata['version']} expects features "
+                             f"{metadata['features']}, not {self.FEATURES}")
+        model.n_jobs = self.n_jobs
+        self.model = model
+        self.compiled_forest = None
+        self.metadata = metadata
+        self.model_version = self.base_version = metadata['version']
+        self.is_trained = True
+        return True
+    
     def train_model(self):
         """Train the ML model"""
         print("Training ML impact prediction model...")
         data = self.generate_training_data()
         
-        X = data.drop('impact_cost', axis=1)
-        y = data['impact_cost']
+        X = data[self.FEATURES].to_numpy()
+        y = data['impact_cost'].to_numpy()
         
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=self.SPLIT_RANDOM_STATE)
         self.model.fit(X_train, y_train)
+        self.compiled_forest = None
         
         score = self.model.score(X_test, y_test)
         print(f"Model trained with R² score: {score:.3f}")
         self.is_trained = True
         
+        self.metadata = self.store.save(self.MODEL_NAME, self.model, {
+            'features': self.FEATURES,
+            'data_hash': self.store.data_hash(data),
+            'score': score,
+            'n_samples': len(data)
+        })
+        self.model_version = self.base_version = self.metadata['version']
+        
+    def swap_model(self, model, version):
+        """Atomically replace the serving model (e.g. after an online update)"""
+        self.model = model
+        self.model_version = version
+        self.compiled_forest = None
+        self.is_trained = True
+        
     def predict_impact(self, order_features):
         """Predict market impact for new order"""
         if not self.is_trained:
             self.train_model()
             
         prediction = self.model.predict([order_features])[0]
-        return max(0, prediction)  # Ensure non-negative
\ No newline at end of file
+        return max(0, prediction)  # Ensure non-negative
+    
+    def predict_impact_cached(self, order_features):
+        """
+        Predict market impact through the quantized-feature prediction cache
+        
+        Orders whose features fall in the same bucket share one prediction,
+        computed on the bucketed features and valid for the current model
+        version only.
+        """
+        if not self.is_trained:
+            self.train_model()
+        
+        key = self.prediction_cache.quantize(order_features)
+        version = self.model_version
+        prediction = self.prediction_cache.get(key, version)
+        if prediction is None:
+            prediction = self.predict_impact(list(key))
+            self.prediction_cache.put(key, prediction, version)
+        return prediction
+    
+    def predict_impact_batch(self, features_2d):
+        """
+        Predict market impact for many orders in one call (rows follow FEATURES)
+        """
+        if not self.is_trained:
+            self.train_model()
+        
+        X = np.asarray(features_2d, dtype=float).reshape(-1, len(self.FEATURES))
+        return np.maximum(self.model.predict(X), 0)
+    
+    def compile_forest(self):
+        """Flatten the trained forest into a CompiledForest for low-latency scoring"""
+        if not self.is_trained:
+            self.train_model()
+        
+        model = self.model
+        compiled = CompiledForest.from_sklearn(model)
+        compiled.source_model = model
+        self.compiled_forest = compiled
+        return compiled
+    
+    def predict_impact_fast(self, order_features):
+        """Predict market impact for one order (or a small batch) with the compiled forest"""
+        compiled = self.compiled_forest
+        if compiled is None or compiled.source_model is not self.model:
+            compiled = self.compile_forest()
+        
+        predictions = np.maximum(compiled.predict(order_features), 0)
+        return predictions[0] if np.ndim(order_features) == 1 else predictions
+
+
+class PredictionCache:
+    """
+    LRU cache of impact predictions keyed on features rounded to
+    `precision` significant digits
+    
+    Entries expire after ttl seconds (None disables) and are all dropped as
+    soon as a lookup arrives for a different model version. hits, misses,
+    evictions and expirations are exposed for sizing.
+    """
+    
+    def __init__(self, maxsize=10000, precision=2, ttl=None):
+        self.maxsize = maxsize
+        self.precision = precision
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+    
+    def quantize(self, order_features):
+        key = []
+        for value in order_features:
+            value = float(value)
+            if value != 0 and math.isfinite(value):
+                exponent = math.floor(math.log10(abs(value))) - self.precision + 1
+                value = round(value, -exponent)
+            key.append(value)
+        return tuple(key)
+    
+    def get(self, key, model_version):
+        with self._lock:
+            if model_version != self.model_version:
+                self.expirations += len(self.entries)
+                self.entries.clear()
+                self.model_version = model_version
+            
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, prediction, model_version):
+        with self._lock:
+            if model_version != self.model_version:
+                return
+            self.entries[key] = (prediction, time.monotonic())
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class ImpactMicroBatcher:
+    """
+    Gathers concurrent single-order predictions into batched model calls
+    
+    Callers on any thread block in predict() while a background worker
+    collects requests for up to max_wait_ms (or max_batch_size rows) and
+    scores them with one predict_impact_batch call. Larger windows trade
+    per-request latency for throughput.
+    """
+    
+    def __init__(self, predictor, max_wait_ms=2.0, max_batch_size=256):
+        self.predictor = predictor
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max_batch_size
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    def submit(self, order_features):
+        """Queue one order; returns a Future for its predicted impact"""
+        if self._closed:
+            raise RuntimeError("ImpactMicroBatcher is closed")
+        n_features = len(self.predictor.FEATURES)
+        if np.shape(order_features) != (n_features,):
+            raise ValueError(f"Expected {n_features} features {self.predictor.FEATURES}, "
+                             f"got shape {np.shape(order_features)}")
+        future = Future()
+        self.requests.put((order_features, future))
+        return future
+    
+    def predict(self, order_features, timeout=None):
+        return self.submit(order_features).result(timeout)
+    
+    def close(self):
+        self._closed = True
+        self.requests.put(None)
+        self._worker.join()
+    
+    def _run(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.requests.put(None)
+                    break
+                batch.append(item)
+            self._score(batch)
+    
+    def _score(self, batch):
+        features = [features for features, _ in batch]
+        try:
+            predictions = self.predictor.predict_impact_batch(features)
+        except Exception:
+            # Score rows one by one so a bad request only fails its own future
+            for order_features, future in batch:
+                try:
+                    future.set_result(self.predictor.predict_impact_batch([order_features])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
\ No newline at end of file
@@ -0,0 +1,74 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+import joblib
+import pandas as pd
+
+STAGING_PREFIX = '.staging-'
+
+class ModelArtifactStore:
+    """
+    Versioned on-disk store for trained models and their metadata
+
+    Layout: <root_dir>/<name>/<version>/{model.joblib, metadata.json}. Versions
+    sort chronologically, so the latest one is loaded unless a version is
+    pinned.
+    """
+
+    def __init__(self, root_dir='models'):
+        self.root_dir = root_dir
+
+    @staticmethod
+    def data_hash(data):
+        """Stable content hash of a training DataFrame"""
+        row_hashes = pd.util.hash_pandas_object(data, index=True).values
+        return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+    def versions(self, name):
+        model_dir = os.path.join(self.root_dir, name)
+        if not os.path.isdir(model_dir):
+            return []
+        # Staging directories are in-flight saves or leftovers from a crashed one
+        return sorted(v for v in os.listdir(model_dir)
+                      if not v.startswith(STAGING_PREFIX)
+                      and os.path.exists(os.path.join(model_dir, v, 'metadata.json')))
+
+    def save(self, name, model, metadata):
+        """Persist a model; returns the metadata including its new version"""
+        timestamp = datetime.now(timezone.utc)
+        version = f"{timestamp:%Y%m%dT%H%M%S%f}-{metadata.get('data_hash', '')[:8]}"
+        metadata = {**metadata, 'name': name, 'version': version,
+                    'created': timestamp.isoformat(), 'model_class': type(model).__name__}
+
+        model_dir = os.path.join(self.root_dir, name)
+        os.makedirs(model_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=model_dir, prefix=STAGING_PREFIX)
+        try:
+            joblib.dump(model, os.path.join(staging, 'model.joblib'))
+            with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            # Rename is atomic, so readers never see a half-written version
+            os.replace(staging, os.path.join(model_dir, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return metadata
+
+    def load(self, name, version=None):
+        """Load (model, metadata) for a pinned version, or the latest one"""
+        if version is None:
+            versions = self.versions(name)
+            if not versions:
+                raise FileNotFoundError(f"No stored versions of model '{name}'")
+            version = versions[-1]
+
+        version_dir = os.path.join(self.root_dir, name, version)
+        if not os.path.exists(os.path.join(version_dir, 'metadata.json')):
+            raise FileNotFoundError(f"Model '{name}' has no version '{version}'")
+        with open(os.path.join(version_dir, 'metadata.json')) as f:
+            metadata = json.load(f)
+        model = joblib.load(os.path.join(version_dir, 'model.joblib'))
+        return model, metadata
@@ -0,0 +1,84 @@
+import copy
+import threading
+from collections import deque
+import numpy as np
+
+class OnlineImpactLearner:
+    """
+    Incrementally updates an MLImpactPredictor from realized executions
+
+    Fills are buffered (at most max_buffer_rows, oldest dropped first). A
+    background thread wakes at most once every min_interval seconds and, if
+    at least min_new_rows fills arrived, warm-starts a copy of the forest with
+    trees_per_update new trees grown on the buffer. The forest is capped at
+    max_trees by retiring the oldest trees, and the updated model replaces
+    the serving one with a single attribute swap, so predictions never wait
+    on training.
+    """
+
+    def __init__(self, predictor, min_interval=60.0, min_new_rows=100,
+                 max_buffer_rows=50000, trees_per_update=10, max_trees=300):
+        self.predictor = predictor
+        self.min_interval = min_interval
+        self.min_new_rows = min_new_rows
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self.buffer = deque(maxlen=max_buffer_rows)
+        self.new_rows = 0
+        self.updates = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record_execution(self, order_features, realized_cost):
+        """Add one completed execution (features in predictor.FEATURES order)"""
+        with self._lock:
+            self.buffer.append((*order_features, realized_cost))
+            self.new_rows += 1
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.min_interval):
+            try:
+                self.update()
+            except Exception as e:
+                # Keep serving the current model; the next cycle retries
+                self.last_error = e
+
+    def update(self):
+        """Grow and swap in a new model if enough fills arrived; returns True if swapped"""
+        with self._lock:
+            if self.new_rows < self.min_new_rows:
+                return False
+            data = np.array(self.buffer, dtype=float)
+            self.new_rows = 0
+
+        if not self.predictor.is_trained:
+            self.predictor.train_model()
+
+        current = self.predictor.model
+        model = copy.copy(current)
+        model.estimators_ = list(current.estimators_)
+        model.warm_start = True
+        model.n_estimators = len(model.estimators_) + self.trees_per_update
+        model.fit(data[:, :-1], data[:, -1])
+
+        if len(model.estimators_) > self.max_trees:
+            model.estimators_ = model.estimators_[-self.max_trees:]
+            model.n_estimators = self.max_trees
+
+        self.updates += 1
+        self.predictor.swap_model(model, f"{self.predictor.base_version}+online{self.updates}")
+        return True
@@ -1,9 +1,12 @@
+import time
 import numpy as np
-from scipy.optimize import minimize
+from market_impact import MarketImpactModel, TRADING_MINUTES, holdings_ratio
+from config import ExecutionConfig
 
 class PortfolioExecution:
-    def __init__(self):
+    def __init__(self, covariance_estimator=None):
         self.correlation_matrix = None
+        self.covariance_estimator = covariance_estimator
         
     def optimize_portfolio_execution(self, orders, correlation_matrix=None):
         """
@@ -11,32 +14,191 @@ class PortfolioExecution:
         """
         n_stocks = len(orders)
         
+        symbols = [order.get('symbol') for order in orders]
+        if correlation_matrix is None and _covers(self.covariance_estimator, symbols):
+            correlation_matrix = self.covariance_estimator.correlation(symbols)
+        
         if correlation_matrix is None:
             # Assume moderate correlation if not provided
-            correlation_matrix = np.eye(n_stocks) * 0.3
+            correlation_matrix = np.full((n_stocks, n_stocks), 0.3)
             np.fill_diagonal(correlation_matrix, 1.0)
         
-        def objective(execution_times):
-            """Minimize total portfolio impact considering correlations"""
-            total_risk = 0
-            for i in range(n_stocks):
-                for j in range(n_stocks):
-                    risk_contribution = (orders[i]['risk'] * orders[j]['risk'] * 
-                                       correlation_matrix[i,j] * 
-                                       min(execution_times[i], execution_times[j]))
-                    total_risk += risk_contribution
-            return total_risk
+        risks = np.array([order['risk'] for order in orders], dtype=float)
+        risk_weights = np.outer(risks, risks) * correlation_matrix
         
         # Constraints: execution times between 1 and 390 minutes
-        bounds = [(1, 390) for _ in range(n_stocks)]
+        lower, upper = 1.0, 390.0
+        execution_times, converged = _minimize_min_time_risk(risk_weights, lower, upper)
+        total_risk, _ = portfolio_time_risk(execution_times, risk_weights)
+        
+        return {
+            'optimal_times': execution_times,
+            'total_risk': total_risk,
+            'success': converged
+        }
+
+def portfolio_time_risk(execution_times, risk_weights):
+    """
+    Portfolio timing risk sum_ij w_ij * min(t_i, t_j) and its exact gradient
+    
+    d/dt_i is w_ii plus 2 * w_ij for every j finishing after i (ties split
+    evenly). The objective equals t . gradient.
+    """
+    t = np.asarray(execution_times, dtype=float)
+    later = (t[:, None] < t[None, :]) + 0.5 * (t[:, None] == t[None, :])
+    gradient = 2 * np.einsum('ij,ij->i', risk_weights, later)
+    return t @ gradient, gradient
+
+def _minimize_min_time_risk(risk_weights, lower, upper, max_flips=None):
+    """
+    Exact box-constrained minimiser of portfolio_time_risk
+    
+    min(t_i, t_j) is the integral over s of [s < t_i][s < t_j], so the
+    objective is lower * sum(W) plus the integral over (lower, upper) of
+    1_S(s)' W 1_S(s), where S(s) is the set still trading at time s. The
+    integrand only depends on the set, so an optimum holds one set S at
+    `upper` and everything else at `lower`, with S minimising 1_S' W 1_S.
+    Gradient methods stall on the kinks of this piecewise-linear objective;
+    instead, starting from S empty (optimal whenever W is positive
+    semidefinite, as for a valid correlation matrix), single-name flips are
+    taken while they lower 1_S' W 1_S, stopping when none does. For an
+    indefinite W that is a local (single-flip) optimum of what is then a
+    binary quadratic program. Returns the times and whether the stopping
+    rule was reached within max_flips.
+    """
+    n = len(risk_weights)
+    diagonal = np.diag(risk_weights)
+    in_set = np.zeros(n, dtype=bool)
+    row_sums = np.zeros(n)  # W 1_S
+    
+    max_flips = 10 * n if max_flips is None else max_flips
+    converged = False
+    for _ in range(max_flips + 1):
+        change = np.where(in_set, diagonal - 2 * row_sums, diagonal + 2 * row_sums)
+        best = int(np.argmin(change))
+        if change[best] >= -1e-12 * max(1.0, np.abs(diagonal).max(initial=0.0)):
+            converged = True
+            break
+        row_sums += (-1 if in_set[best] else 1) * risk_weights[:, best]
+        in_set[best] = not in_set[best]
+    
+    return np.where(in_set, upper, lower), converged
+
+class MultiAssetAlmgrenChriss:
+    """
+    Joint Almgren-Chriss trajectories for a basket under cross-asset covariance
+    
+    Minimises expected impact cost + risk_aversion * variance over holdings
+    x_k (names x buckets). With diagonal temporary impact H the first-order
+    conditions are H (x_{k-1} - 2 x_k + x_{k+1}) = lambda tau^2 C x_k; the
+    change of variables y = H^1/2 x and one eigendecomposition of
+    H^-1/2 C H^-1/2 decouple them into independent single-asset sinh/kappa
+    solutions, so no iterative optimiser is needed.
+    """
+    
+    def __init__(self, config=None, covariance_estimator=None):
+        self.config = config or ExecutionConfig()
+        self.impact_model = MarketImpactModel(self.config)
+        self.covariance_estimator = covariance_estimator
+    
+    def optimal_trajectories(self, orders, covariance=None, risk_aversion=None,
+                             time_horizon=None, default_volume=1000000):
+        """
+        Solve the joint trajectory for orders ({'symbol', 'size', 'risk'} and
+        optionally 'average_volume'); covariance is of daily returns and
+        defaults to the covariance estimator's sub-block for the basket, or
+        diag(risk^2) without one
+        
+        Returns holdings (n x n_buckets+1), schedules (n x n_buckets) and the
+        basket's expected cost and variance, plus per-name expected costs.
+        """
+        time_horizon = time_horizon or self.config.TIME_HORIZON
+        risk_aversion = self.config.RISK_AVERSION if risk_aversion is None else risk_aversion
+        n_buckets = max(1, time_horizon // self.config.MIN_TIME_SLICE)
+        tau = time_horizon / n_buckets
+        
+        shares = np.array([order['size'] for order in orders], dtype=float)
+        risks = np.array([order['risk'] for order in orders], dtype=float)
+        volumes = np.array([order.get('average_volume', default_volume) for order in orders],
+                           dtype=float)
+        symbols = [order['symbol'] for order in orders]
+        if covariance is None and _covers(self.covariance_estimator, symbols):
+            covariance = self.covariance_estimator.covariance(symbols)
+        if covariance is None:
+            covariance = np.diag(risks**2)
+        covariance_per_minute = np.asarray(covariance, dtype=float) / TRADING_MINUTES
+        
+        eta, gamma = self.impact_model.impact_coefficients(shares, time_horizon, risks, volumes)
+        eta_tilde = eta - 0.5 * gamma * tau
+        if np.any(eta_tilde <= 0):
+            raise ValueError("Temporary impact eta must exceed gamma * tau / 2 for every name")
+        
+        # Decouple: A = H^-1/2 C H^-1/2 = U diag(mu) U^T, one kappa per eigenmode
+        inv_sqrt_h = 1 / np.sqrt(eta_tilde)
+        mu, modes = np.linalg.eigh(covariance_per_minute * np.outer(inv_sqrt_h, inv_sqrt_h))
+        mu = np.clip(mu, 0, None)
+        kappa = np.arccosh(1 + 0.5 * risk_aversion * mu * tau**2) / tau
         
-        # Initial guess: proportional to order size
-        x0 = [min(390, max(1, order['size'] / 10000)) for order in orders]
+        t = np.arange(n_buckets + 1) * tau
+        mode_holdings = (modes.T @ (np.sqrt(eta_tilde) * shares))[:, None]
+        mode_holdings = mode_holdings * holdings_ratio(kappa[:, None], t, time_horizon)
+        holdings = inv_sqrt_h[:, None] * (modes @ mode_holdings)
+        holdings[:, -1] = 0.0
+        schedules = -np.diff(holdings, axis=1)
         
-        result = minimize(objective, x0, bounds=bounds, method='L-BFGS-B')
+        name_costs = 0.5 * gamma * shares**2 + eta_tilde / tau * np.sum(schedules**2, axis=1)
+        variance = tau * np.einsum('ik,ij,jk->', holdings[:, 1:], covariance_per_minute,
+                                   holdings[:, 1:])
         
         return {
-            'optimal_times': result.x,
-            'total_risk': result.fun,
-            'success': result.success
-        }
\ No newline at end of file
+            'symbols': symbols,
+            'holdings': holdings,
+            'schedules': schedules,
+            'name_costs': name_costs,
+            'expected_cost': name_costs.sum(),
+            'variance': variance,
+            'time_grid': t
+        }
+
+def _covers(covariance_estimator, symbols):
+    """True if the estimator has data for every symbol"""
+    return (covariance_estimator is not None and covariance_estimator.count > 0 and
+            all(symbol in covariance_estimator.index for symbol in symbols))
+
+def benchmark(basket_sizes=(100, 500, 2000), seed=42):
+    """
+    Time optimize_portfolio_execution on random baskets of increasing size,
+    against the risk of the size-proportional starting schedule and of a
+    random-correlation (indefinite) variant that needs the flip search
+    """
+    rng = np.random.default_rng(seed)
+    optimizer = PortfolioExecution()
+    
+    for n in basket_sizes:
+        sizes = rng.exponential(500000, n)
+        risks = rng.uniform(0.01, 0.04, n)
+        orders = [{'symbol': f'S{i}', 'size': size, 'risk': risk}
+                  for i, (size, risk) in enumerate(zip(sizes, risks))]
+        factors = rng.normal(size=(n, 3))
+        covariance = factors @ factors.T + np.diag(rng.uniform(0.5, 1.5, n))
+        scale = np.sqrt(np.diag(covariance))
+        correlation = covariance / np.outer(scale, scale)
+        proportional = np.clip(sizes / 10000, 1, 390)
+        
+        for label, matrix in (('factor', correlation),
+                              ('indefinite', np.clip(correlation + rng.normal(0, 0.2, (n, n)),
+                                                     -1, 1))):
+            matrix = (matrix + matrix.T) / 2
+            np.fill_diagonal(matrix, 1.0)
+            start = time.perf_counter()
+            result = optimizer.optimize_portfolio_execution(orders, matrix)
+            elapsed = time.perf_counter() - start
+            baseline, _ = portfolio_time_risk(proportional, np.outer(risks, risks) * matrix)
+            print(f"  {n:>5} names ({label:>10}): {elapsed:6.2f}s  "
+                  f"risk={result['total_risk']:.4f}  proportional={baseline:.4f}  "
+                  f"success={result['success']}")
+
+if __name__ == "__main__":
+    print("📊 PORTFOLIO EXECUTION BENCHMARK")
+    print("=" * 40)
+    benchmark()
@@ -0,0 +1,175 @@
+import asyncio
+import numpy as np
+import pandas as pd
+from data_feed import MarketDataFeed, CONDITION_FIELDS
+from market_impact import TRADING_MINUTES
+
+TRADE_FIELDS = ['timestamp', 'price', 'size']
+QUOTE_FIELDS = ['timestamp', 'bid', 'ask', 'bid_size', 'ask_size']
+
+class RingBuffer:
+    """
+    Fixed-capacity ring buffer of float64 rows; memory never grows
+    """
+
+    def __init__(self, capacity, n_fields):
+        self.data = np.zeros((capacity, n_fields))
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+    def append(self, row):
+        self.data[self.index] = row
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def extend(self, rows):
+        """Append many rows at once, keeping only the newest capacity rows"""
+        rows = np.asarray(rows, dtype=float)[-self.capacity:]
+        n = len(rows)
+        first = min(n, self.capacity - self.index)
+        self.data[self.index:self.index + first] = rows[:first]
+        self.data[:n - first] = rows[first:]
+        self.index = (self.index + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def values(self):
+        """Rows in arrival order (oldest first)"""
+        if self.count < self.capacity:
+            return self.data[:self.count].copy()
+        return np.roll(self.data, -self.index, axis=0)
+
+    def last(self):
+        return self.data[self.index - 1] if self.count else None
+
+
+class ReplayMarketDataFeed(MarketDataFeed):
+    """
+    Replays recorded trades and quotes from CSV or Parquet tapes
+
+    A tape has columns timestamp (seconds or datetime), symbol, event ('T' for
+    trades, 'Q' for quotes), price, size, bid, ask, bid_size, ask_size. Files
+    are read in chunks and each symbol keeps fixed-size ring buffers of its
+    most recent trades and quotes, from which market conditions and hidden
+    liquidity are derived.
+    """
+
+    def __init__(self, buffer_size=5000, chunksize=100000):
+        super().__init__()
+        self.buffer_size = buffer_size
+        self.chunksize = chunksize
+        self.trades = {}
+        self.quotes = {}
+
+    def _buffers(self, symbol):
+        if symbol not in self.trades:
+            self.trades[symbol] = RingBuffer(self.buffer_size, len(TRADE_FIELDS))
+            self.quotes[symbol] = RingBuffer(self.buffer_size, len(QUOTE_FIELDS))
+        return self.trades[symbol], self.quotes[symbol]
+
+    def _read_chunks(self, path):
+        """Yield DataFrame chunks without loading the whole file"""
+        if str(path).endswith(('.parquet', '.pq')):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet replay requires pyarrow")
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunksize):
+                yield self._normalize(batch.to_pandas())
+        else:
+            for chunk in pd.read_csv(path, chunksize=self.chunksize):
+                yield self._normalize(chunk)
+
+    def _normalize(self, chunk):
+        if not pd.api.types.is_numeric_dtype(chunk['timestamp']):
+            timestamps = pd.to_datetime(chunk['timestamp']).to_numpy(dtype='datetime64[ns]')
+            chunk['timestamp'] = timestamps.astype('int64') / 1e9
+        return chunk
+
+    def _apply(self, chunk):
+        """Push a chunk into the ring buffers, one vectorized write per symbol"""
+        is_trade = (chunk['event'] == 'T').to_numpy()
+        for symbol, rows in chunk[is_trade].groupby('symbol', sort=False):
+            self._buffers(symbol)[0].extend(rows[TRADE_FIELDS].to_numpy(dtype=float))
+        for symbol, rows in chunk[~is_trade].groupby('symbol', sort=False):
+            self._buffers(symbol)[1].extend(rows[QUOTE_FIELDS].to_numpy(dtype=float))
+
+    def _apply_event(self, event):
+        trades, quotes = self._buffers(event.symbol)
+        if event.event == 'T':
+            trades.append((event.timestamp, event.price, event.size))
+        else:
+            quotes.append((event.timestamp, event.bid, event.ask,
+                           event.bid_size, event.ask_size))
+
+    def replay(self, path):
+        """
+        Stream a tape event by event, updating per-symbol state as it goes
+        """
+        for chunk in self._read_chunks(path):
+            for event in chunk.itertuples(index=False):
+                self._apply_event(event)
+                yield event
+
+    def replay_chunks(self, path):
+        """Stream a tape chunk by chunk; faster when per-event hooks are not needed"""
+        for chunk in self._read_chunks(path):
+            self._apply(chunk)
+            yield chunk
+
+    async def areplay(self, path):
+        """
+        Async iterator over tape events; file reads run in the default executor
+        """
+        loop = asyncio.get_running_loop()
+        chunks = self._read_chunks(path)
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            for event in chunk.itertuples(index=False):
+                self._apply_event(event)
+                yield event
+            await asyncio.sleep(0)
+
+    def get_market_conditions(self, rng=None, symbol=None):
+        """
+        Market conditions from the replayed state of a symbol
+
+        Volatility and volume are scaled from the buffered window to a full
+        trading day. Falls back to simulated conditions for unknown symbols.
+        """
+        if symbol not in self.trades or self.trades[symbol].count < 2:
+            return super().get_market_conditions(rng)
+
+        timestamps, prices, sizes = self.trades[symbol].values().T
+        span = max(timestamps[-1] - timestamps[0], 1.0)
+        day_scale = TRADING_MINUTES * 60 / span
+        returns = np.diff(np.log(prices))
+
+        quotes = self.quotes[symbol].values()
+        spread = np.mean(quotes[:, 2] - quotes[:, 1]) if len(quotes) else np.nan
+
+        return {
+            'volatility': np.sqrt(np.sum(returns**2) * day_scale),
+            'average_volume': np.sum(sizes) * day_scale,
+            'momentum': prices[-1] / prices[0] - 1,
+            'spread': spread
+        }
+
+    def _compute_conditions(self, symbols, rng=None):
+        rows = [self.get_market_conditions(rng, symbol=symbol) for symbol in symbols]
+        return {field: np.array([row[field] for row in rows], dtype=float)
+                for field in CONDITION_FIELDS}
+
+    def estimate_hidden_liquidity(self, recent_trades=None, order_book=None, symbol=None):
+        """
+        Detect hidden liquidity from the replayed state of a symbol
+        """
+        if symbol in self.trades:
+            if recent_trades is None and self.trades[symbol].count:
+                recent_trades = self.trades[symbol].values()[:, 2]
+            last_quote = self.quotes[symbol].last()
+            if order_book is None and last_quote is not None:
+                order_book = {'bid_volume': last_quote[3], 'ask_volume': last_quote[4]}
+        return super().estimate_hidden_liquidity(recent_trades, order_book)
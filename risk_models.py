@@ -1,5 +1,7 @@
 import numpy as np
+import pandas as pd
 from scipy import stats
+from config import ExecutionConfig
 
 class RiskModels:
     """
@@ -15,6 +17,15 @@ class RiskModels:
         """
         return position * volatility * stats.norm.ppf(confidence)
     
+    def empirical_var_cvar(self, losses, confidence=0.95):
+        """
+        Value at Risk and Conditional VaR (expected shortfall) of a loss sample
+        """
+        losses = np.asarray(losses, dtype=float)
+        var = np.quantile(losses, confidence)
+        tail = losses[losses >= var]
+        return var, tail.mean()
+    
     def execution_risk(self, remaining_shares, volatility, time_remaining):
         """
         Calculate execution risk (variance of implementation shortfall)
@@ -39,25 +50,74 @@ class RiskModels:
         """
         Test execution plan under various market scenarios
         """
-        results = {}
+        names = list(market_scenarios)
+        volatilities = [market_scenarios[n].get('volatility', 0.02) for n in names]
+        volatility_scales = [market_scenarios[n].get('volatility_scale', 1.0) for n in names]
+        volume_changes = [market_scenarios[n].get('volume_change', 1.0) for n in names]
+        average_volumes = [market_scenarios[n].get('average_volume', 1000000) for n in names]
         
-        for scenario_name, conditions in market_scenarios.items():
-            volatility = conditions.get('volatility', 0.02)
-            volume_change = conditions.get('volume_change', 1.0)
-            
-            # Calculate costs under stressed conditions
-            stressed_volume = conditions.get('average_volume', 1000000) * volume_change
-            stressed_volatility = volatility * conditions.get('volatility_scale', 1.0)
-            
-            # Simplified stress test calculation
-            market_impact = np.sum(execution_plan) * stressed_volatility * 0.02
-            timing_risk = self.execution_risk(np.sum(execution_plan), 
-                                            stressed_volatility, 1.0)
-            
+        grid = self._stress_arrays(execution_plan, volatility_scales, volume_changes,
+                                   volatilities, average_volumes)
+        
+        results = {}
+        for i, scenario_name in enumerate(names):
             results[scenario_name] = {
-                'market_impact_cost': market_impact,
-                'timing_risk': timing_risk,
-                'total_cost': market_impact + 0.1 * timing_risk
+                'market_impact_cost': grid['market_impact_cost'][0, i],
+                'timing_risk': grid['timing_risk'][0, i],
+                'total_cost': grid['total_cost'][0, i]
             }
         
-        return results
\ No newline at end of file
+        return results
+    
+    def stress_test_grid(self, execution_plans, volatility_scales, volume_changes,
+                         volatility=0.02, average_volume=1000000):
+        """
+        Evaluate one or many execution plans against a grid of scenarios at once
+        
+        volatility_scales and volume_changes are paired per-scenario arrays;
+        volatility and average_volume are scalars or per-scenario arrays.
+        Returns a long DataFrame with one row per (plan, scenario).
+        """
+        grid = self._stress_arrays(execution_plans, volatility_scales, volume_changes,
+                                   volatility, average_volume)
+        n_plans, n_scenarios = grid['total_cost'].shape
+        
+        columns = {
+            'plan': np.repeat(np.arange(n_plans), n_scenarios),
+            'scenario': np.tile(np.arange(n_scenarios), n_plans)
+        }
+        for name in ('volatility_scale', 'volume_change', 'stressed_volatility',
+                     'stressed_volume'):
+            columns[name] = np.tile(grid[name], n_plans)
+        for name in ('market_impact_cost', 'timing_risk', 'total_cost'):
+            columns[name] = grid[name].ravel()
+        
+        return pd.DataFrame(columns)
+    
+    def _stress_arrays(self, execution_plans, volatility_scales, volume_changes,
+                       volatility, average_volume):
+        """Broadcast plans (rows) against scenarios (columns)"""
+        plans = np.atleast_2d(np.asarray(execution_plans, dtype=float))
+        volatility_scales = np.asarray(volatility_scales, dtype=float).ravel()
+        volume_changes = np.asarray(volume_changes, dtype=float).ravel()
+        n_scenarios = len(volatility_scales)
+        
+        stressed_volatility = (np.broadcast_to(volatility, (n_scenarios,)) *
+                               volatility_scales)
+        stressed_volume = (np.broadcast_to(average_volume, (n_scenarios,)) *
+                           volume_changes)
+        
+        # Simplified stress test calculation
+        total_shares = plans.sum(axis=1)[:, None]
+        market_impact = total_shares * stressed_volatility * 0.02
+        timing_risk = self.execution_risk(total_shares, stressed_volatility, 1.0)
+        
+        return {
+            'volatility_scale': volatility_scales,
+            'volume_change': volume_changes,
+            'stressed_volatility': stressed_volatility,
+            'stressed_volume': stressed_volume,
+            'market_impact_cost': market_impact,
+            'timing_risk': timing_risk,
+            'total_cost': market_impact + 0.1 * timing_risk
+        }
@@ -0,0 +1,40 @@
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from compiled_forest import CompiledForest
+from ml_impact_predictor import MLImpactPredictor
+from model_store import ModelArtifactStore
+
+def make_data(rng, n_samples):
+    X = np.column_stack([
+        rng.exponential(100000, n_samples),
+        rng.uniform(0, 1, n_samples),
+        rng.uniform(0.01, 0.1, n_samples),
+        rng.lognormal(20, 1, n_samples),
+        rng.uniform(0.001, 0.5, n_samples),
+        rng.uniform(0.01, 0.1, n_samples)
+    ])
+    y = X[:, 0] * (0.0001 + 0.0002 * X[:, 1] + 0.001 * X[:, 2]) + rng.normal(0, 100, n_samples)
+    return X, y
+
+def test_matches_sklearn():
+    rng = np.random.default_rng(0)
+    X, y = make_data(rng, 2000)
+    for max_depth in (None, 10):
+        model = RandomForestRegressor(n_estimators=20, max_depth=max_depth,
+                                      random_state=0).fit(X, y)
+        compiled = CompiledForest.from_sklearn(model)
+        X_check, _ = make_data(rng, 256)
+        np.testing.assert_allclose(compiled.predict(X_check), model.predict(X_check),
+                                   rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(compiled.predict(X_check[0]), model.predict(X_check[:1]),
+                                   rtol=1e-9, atol=1e-9)
+
+def test_compile_leaves_global_rng_alone(tmp_path):
+    predictor = MLImpactPredictor(n_estimators=5, store=ModelArtifactStore(str(tmp_path)))
+    predictor.train_model()
+
+    np.random.seed(123)
+    expected = np.random.random()
+    np.random.seed(123)
+    predictor.compile_forest()
+    assert np.random.random() == expected
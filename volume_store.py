@@ -0,0 +1,64 @@
+import os
+import numpy as np
+from collections import OrderedDict
+from market_impact import TRADING_MINUTES
+
+class VolumeProfileStore:
+    """
+    On-disk intraday volume profiles, one memory-mapped float32 file per symbol
+
+    Each file is a flat days x 390 float32 array that only ever grows by
+    appending a day, so reads map just the pages they touch. Derived average
+    curves are kept in an LRU cache.
+    """
+
+    def __init__(self, root_dir='volume_profiles', cache_size=10000):
+        self.root_dir = root_dir
+        self.cache_size = cache_size
+        self._curves = OrderedDict()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self.root_dir, f"{symbol}.f32")
+
+    def n_days(self, symbol):
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // (4 * TRADING_MINUTES)
+
+    def append_day(self, symbol, minute_volumes):
+        """Append one day of per-minute volumes for a symbol"""
+        minute_volumes = np.asarray(minute_volumes, dtype=np.float32)
+        if minute_volumes.shape != (TRADING_MINUTES,):
+            raise ValueError(f"Expected {TRADING_MINUTES} minute volumes, got {minute_volumes.shape}")
+        with open(self._path(symbol), 'ab') as f:
+            f.write(minute_volumes.tobytes())
+
+    def history(self, symbol, days=None):
+        """Read-only memory map of the last `days` days (all days if None)"""
+        total = self.n_days(symbol)
+        if total == 0:
+            raise KeyError(f"No volume history for {symbol}")
+        profile = np.memmap(self._path(symbol), dtype=np.float32, mode='r',
+                            shape=(total, TRADING_MINUTES))
+        return profile if days is None else profile[-days:]
+
+    def average_profile(self, symbol, days=30):
+        """Mean per-minute volume over the last `days` days (cached)"""
+        key = (symbol, days, self.n_days(symbol))
+        curve = self._curves.get(key)
+        if curve is not None:
+            self._curves.move_to_end(key)
+            return curve
+
+        curve = self.history(symbol, days).mean(axis=0, dtype=np.float64)
+        curve.setflags(write=False)
+        self._curves[key] = curve
+        if len(self._curves) > self.cache_size:
+            self._curves.popitem(last=False)
+        return curve
+
+    def average_profiles(self, symbols, days=30):
+        """Average curves for many symbols as a (n_symbols, 390) matrix"""
+        return np.vstack([self.average_profile(symbol, days) for symbol in symbols])